@@ -62,6 +62,22 @@ interface ConfirmState {
   onConfirm: () => void
 }
 
+// FastAPI errors carry a string detail, except the 422 for fixed slots
+// that clash, whose detail also lists the slots to edit.
+function errorDetail(detail: any, status: number): string {
+  if (!detail) return `API Error: ${status}`
+  if (typeof detail === "string") return detail
+  if (Array.isArray(detail)) return detail.map((d: any) => d.msg).join("; ")
+  const slotIds = [
+    ...(detail.professor_clashes ?? []),
+    ...(detail.room_overflows ?? []),
+  ].flatMap((c: any) => c.slot_ids ?? [])
+  const listed = [...new Set(slotIds)].join(", ")
+  return listed
+    ? `${detail.message} Clashing slot IDs: ${listed}`
+    : detail.message || `API Error: ${status}`
+}
+
 export default function AdminPage() {
   const router = useRouter()
   const [professors, setProfessors] = useState<Professor[]>([])
@@ -205,10 +221,23 @@ export default function AdminPage() {
 
       if (!response.ok) {
         const errData = await response.json().catch(() => ({}))
-        throw new Error(errData.detail || `API Error: ${response.status}`)
+        throw new Error(errorDetail(errData.detail, response.status))
+      }
+
+      const { job_id } = await response.json()
+      let job: any
+      do {
+        await new Promise(resolve => setTimeout(resolve, 2000))
+        const jobRes = await fetch(`${apiUrl}/api/jobs/${job_id}`)
+        if (!jobRes.ok) throw new Error(`API Error: ${jobRes.status}`)
+        job = await jobRes.json()
+      } while (job.status === "queued" || job.status === "running")
+
+      if (job.status !== "done") {
+        throw new Error(job.error || `Schedule generation ${job.status}`)
       }
 
-      const data = await response.json()
+      const data = job.result
 
       if (data.success) {
         setScheduleResult({
@@ -0,0 +1,36 @@
+import os, sys, time
+import numpy as np
+import ga_engine
+from synthetic import generate_institution
+
+WORKER_COUNTS = [int(w) for w in os.getenv("BENCH_WORKERS", "1,2,4,8,16").split(",")]
+GENERATIONS   = int(os.getenv("BENCH_GENERATIONS", 10))
+POPULATION    = int(os.getenv("BENCH_POPULATION", 64))
+
+
+def main() -> None:
+    n_profs, n_rooms, n_slots = (int(a) for a in (sys.argv[1:] or ["400", "150", "2000"]))
+    data = ga_engine.prepare_data(*generate_institution(n_profs, n_rooms, n_slots))
+    rng  = np.random.default_rng(0)
+    pops = [[ga_engine.random_chromosome(data, rng) for _ in range(POPULATION)] for _ in range(GENERATIONS)]
+
+    print(f"{n_profs} professors, {n_rooms} rooms, {n_slots} slots, "
+          f"population {POPULATION}, {GENERATIONS} generations")
+    t0 = time.perf_counter()
+    serial = [ga_engine.evaluate_population(pop, data) for pop in pops]
+    base = time.perf_counter() - t0
+    print(f"serial     {base:8.3f}s  1.00x")
+
+    for workers in WORKER_COUNTS:
+        if workers < 2:
+            continue
+        with ga_engine.open_pool(data, workers) as pool:
+            t0 = time.perf_counter()
+            evals = [ga_engine.evaluate_parallel(pop, pool, workers) for pop in pops]
+            took = time.perf_counter() - t0
+        assert evals == serial, "parallel results differ from serial"
+        print(f"workers={workers:<3d}{took:8.3f}s  {base / took:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
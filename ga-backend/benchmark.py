@@ -0,0 +1,97 @@
+import argparse, contextlib, json, os, platform, resource, subprocess, sys, tempfile, time
+
+
+def run_tier(tier: str) -> dict:
+    # Runs inside a fresh interpreter so peak RSS belongs to this tier alone;
+    # storage and GA settings come from the environment set by main().
+    import numpy as np
+    import ga_engine
+    import sqlite_store
+    from synthetic import tier_institution
+
+    professors, rooms, slots = tier_institution(tier, seed=int(os.environ["BENCH_SEED"]))
+    sqlite_store.insert_problem(professors, rooms, slots)
+
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(sys.stderr):
+        # synthetic tiers include fixed-slot clashes by construction
+        result = ga_engine.run_genetic_algorithm(seed=int(os.environ["BENCH_SEED"]), allow_infeasible=True)
+    wall = time.perf_counter() - t0
+
+    if "error" in result:
+        raise RuntimeError(result["error"])
+
+    timings  = result["timings"]
+    gen_time = sum(timings[p] for p in ga_engine.GA_PHASES)
+    return {
+        "tier":                tier,
+        "professors":          len(professors),
+        "rooms":               len(rooms),
+        "slots":               len(slots),
+        "ai_assign_slots":     sum(1 for s in slots if s["ai_assign_time"]),
+        "population":          ga_engine.POPULATION_SIZE,
+        "generations":         result["generations"],
+        "wall_seconds":        wall,
+        "generations_per_sec": result["generations"] / gen_time if gen_time else None,
+        "phase_seconds":       timings,
+        "peak_rss_mb":         resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "hard_violations":     result["hard_violations"],
+        "lower_bound":         result["lower_bound"],
+        "fitness_score":       result["fitness_score"],
+        "gini_workload":       result["gini_workload"],
+        "gini_room_usage":     result["gini_room_usage"],
+        "gini_ac_access":      result["gini_ac_access"],
+        "seed":                result["seed"],
+        "numpy":               np.__version__,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline GA benchmark on synthetic institutions.")
+    parser.add_argument("--tiers", default="thesis,10x,100x", help="comma-separated: thesis, 10x, 100x")
+    parser.add_argument("--generations", type=int, default=50)
+    parser.add_argument("--population", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    parser.add_argument("--run-tier", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_tier:
+        print(json.dumps(run_tier(args.run_tier)))
+        return
+
+    tiers = []
+    for tier in args.tiers.split(","):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(
+                os.environ,
+                STORAGE_BACKEND = "sqlite",
+                SQLITE_PATH     = os.path.join(tmp, "bench.db"),
+                POPULATION_SIZE = str(args.population),
+                MAX_GENERATIONS = str(args.generations),
+                BENCH_SEED      = str(args.seed),
+            )
+            print(f"running tier {tier} ...", file=sys.stderr)
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--run-tier", tier],
+                env=env, check=True, stdout=subprocess.PIPE, text=True,
+            ).stdout
+            tiers.append(json.loads(out.strip().splitlines()[-1]))
+
+    report = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python":       platform.python_version(),
+        "platform":     platform.platform(),
+        "config":       {"generations": args.generations, "population": args.population, "seed": args.seed},
+        "tiers":        tiers,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+# ga_test.py and test_insert.py are scripts that need a live database.
+collect_ignore = ["ga_test.py", "test_insert.py"]
+
+
+def pairwise_gini(values: list) -> float:
+    # The O(n^2) Gini that gini/gini_batch replaced; the reference both
+    # test modules compare against.
+    n = len(values)
+    if n < 2:
+        return 0.0
+    mean = sum(values) / n
+    if mean == 0:
+        return 0.0
+    total = sum(abs(values[i] - values[j]) for i in range(n) for j in range(n))
+    return total / (2.0 * n * n * mean)
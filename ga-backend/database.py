@@ -1,6 +1,4 @@
-import os
-import requests
-from supabase import create_client, Client
+import hashlib, os, threading, time
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -9,7 +7,78 @@ raw_url      = os.getenv("SUPABASE_URL", "")
 supabase_url = raw_url.split("/rest/v1")[0].rstrip("/")
 supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_KEY", "")
 
-supabase: Client = create_client(supabase_url, supabase_key)
+# "supabase" (default) or "sqlite" for offline runs, see sqlite_store.py
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "supabase").lower()
+
+UPSERT_CHUNK_SIZE = int(os.getenv("DB_UPSERT_CHUNK_SIZE", 500))
+
+# One keep-alive connection pool per process for all Supabase traffic.
+POOL_SIZE      = int(os.getenv("DB_POOL_SIZE",        10))
+RETRIES        = int(os.getenv("DB_RETRIES",           3))
+RETRY_BACKOFF  = float(os.getenv("DB_RETRY_BACKOFF", 0.5))
+HTTP_TIMEOUT   = float(os.getenv("DB_TIMEOUT",        15))
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_client         = None
+_session        = None
+_version_warned = False
+_client_lock    = threading.Lock()
+
+
+def client():
+    # The Supabase client (and the supabase package itself, most of this
+    # module's import time) is only loaded on first use, on a shared pooled
+    # httpx client.
+    global _client
+    with _client_lock:
+        if _client is None:
+            import httpx
+            from supabase import create_client
+            from supabase.lib.client_options import SyncClientOptions
+            http = httpx.Client(
+                timeout   = HTTP_TIMEOUT,
+                limits    = httpx.Limits(max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE),
+                transport = httpx.HTTPTransport(retries=RETRIES),  # connection failures only
+            )
+            _client = create_client(supabase_url, supabase_key, options=SyncClientOptions(httpx_client=http))
+    return _client
+
+
+def http_session():
+    # Shared requests.Session for the raw REST calls. Retries back off
+    # exponentially; POST is not in urllib3's idempotent set, so it is only
+    # retried when the connection failed before the request was sent.
+    global _session
+    with _client_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+            adapter = HTTPAdapter(
+                pool_connections = POOL_SIZE,
+                pool_maxsize     = POOL_SIZE,
+                max_retries      = Retry(total=RETRIES, backoff_factor=RETRY_BACKOFF,
+                                         status_forcelist=RETRY_STATUSES),
+            )
+            _session = requests.Session()
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+    return _session
+
+
+def execute(query, idempotent: bool = True):
+    # Runs a postgrest query, retrying timeouts and dropped connections with
+    # exponential backoff. Non-idempotent writes are only retried when the
+    # connection could not be opened at all.
+    import httpx
+    retryable = httpx.TransportError if idempotent else (httpx.ConnectError, httpx.ConnectTimeout)
+    for attempt in range(RETRIES + 1):
+        try:
+            return query.execute()
+        except retryable:
+            if attempt == RETRIES:
+                raise
+            time.sleep(RETRY_BACKOFF * 2 ** attempt)
 
 """
 SQL MIGRATION — run once in Supabase SQL editor before using AI-assign slots.
@@ -70,7 +139,7 @@ FRONTEND NOTE (conflict panel in admin-calendar-grid.tsx):
 
 def get_all_professors() -> list:
     try:
-        return supabase.table("professors").select("*").execute().data or []
+        return execute(client().table("professors").select("*")).data or []
     except Exception as e:
         print(f"[DB] get_all_professors: {e}")
         return []
@@ -78,7 +147,7 @@ def get_all_professors() -> list:
 
 def get_all_rooms() -> list:
     try:
-        rows = supabase.table("rooms").select("*").execute().data or []
+        rows = execute(client().table("rooms").select("*")).data or []
         for r in rows:
             if r.get("room_type") == "Laboratory":
                 r["is_ac"] = False
@@ -90,22 +159,111 @@ def get_all_rooms() -> list:
 
 def get_all_timetable_slots() -> list:
     try:
-        return supabase.table("timetable_slots").select("*").execute().data or []
+        return execute(client().table("timetable_slots").select("*")).data or []
     except Exception as e:
         print(f"[DB] get_all_timetable_slots: {e}")
         return []
 
 
-def get_timetable_slots() -> list:
+def get_data_version():
+    # One single-row request per table instead of a full fetch; returns None
+    # when the version cannot be read so callers treat the data as changed.
+    # Row counts alone miss edits, so without updated_at (see
+    # migration_add_updated_at.sql) there is no version and nothing is cached.
+    global _version_warned
+    version = []
     try:
-        return (
-            supabase.table("timetable_slots")
-            .select("*, professors(id, name, title, department)")
-            .execute().data or []
-        )
+        for table in ("professors", "rooms", "timetable_slots"):
+            res = execute(
+                client().table(table)
+                .select("updated_at", count="exact")
+                .order("updated_at", desc=True)
+                .limit(1)
+            )
+            latest = res.data[0]["updated_at"] if res.data else None
+            version.append((table, res.count, latest))
+        return tuple(version)
     except Exception as e:
-        print(f"[DB] get_timetable_slots: {e}")
-        return []
+        if not _version_warned:
+            print(f"[DB] get_data_version: {e} (run migration_add_updated_at.sql; reads are not cached until then)")
+            _version_warned = True
+        return None
+
+
+# Columns the read endpoints may project; "professors" is the joined
+# professor record rather than a column of timetable_slots.
+TIMETABLE_COLUMNS = (
+    "id", "professor_id", "day_of_week", "hour", "end_hour", "subject", "room",
+    "needs_ac", "ai_assign_time", "created_at", "updated_at", "professors",
+)
+SCHEDULE_COLUMNS = (
+    "id", "fitness_score", "hard_constraint_violations", "soft_constraint_score",
+    "gini_workload", "gini_room_usage", "gini_ac_access", "status",
+    "generation_date", "created_at", "notes",
+)
+
+
+def _select(columns) -> str:
+    if not columns:
+        return "*"
+    return ", ".join("professors(id, name, title, department)" if c == "professors" else c for c in columns)
+
+
+def get_timetable_slots(
+    columns:      tuple = None,
+    professor_id: int   = None,
+    day_of_week:  int   = None,
+    room:         str   = None,
+    after:        int   = None,
+    limit:        int   = None,
+) -> list:
+    # Ordered by id so `after` (the last id of the previous page) is a
+    # stable cursor. Raises on a failed read, like get_generated_schedules,
+    # so /api/timetable never caches an empty calendar.
+    query = client().table("timetable_slots").select(_select(columns or ("*", "professors")))
+    if professor_id is not None:
+        query = query.eq("professor_id", professor_id)
+    if day_of_week is not None:
+        query = query.eq("day_of_week", day_of_week)
+    if room is not None:
+        query = query.eq("room", room)
+    if after is not None:
+        query = query.gt("id", after)
+    query = query.order("id")
+    if limit:
+        query = query.limit(limit)
+    return execute(query).data or []
+
+
+def get_generated_schedules(
+    columns: tuple = None,
+    status:  str   = None,
+    before:  int   = None,
+    limit:   int   = None,
+) -> list:
+    # Newest first; ids are assigned in creation order, so `before` (the
+    # last id of the previous page) is a stable cursor.
+    query = client().table("generated_schedules").select(_select(columns))
+    if status is not None:
+        query = query.eq("status", status)
+    if before is not None:
+        query = query.lt("id", before)
+    query = query.order("id", desc=True)
+    if limit:
+        query = query.limit(limit)
+    return execute(query).data or []
+
+
+def get_schedules_version():
+    # generated_schedules has no updated_at, so the version is a digest of
+    # every (id, status) pair: status changes from the admin panel count.
+    try:
+        rows = execute(client().table("generated_schedules").select("id, status").order("id")).data or []
+        pairs = repr([(r["id"], r["status"]) for r in rows]).encode()
+        return (len(rows), hashlib.blake2b(pairs, digest_size=8).hexdigest())
+    except Exception as e:
+        print(f"[DB] get_schedules_version: {e}")
+        return None
 
 
 def get_db_data() -> dict:
@@ -142,7 +300,7 @@ def save_generated_schedule(
         "gini_ac_access":             float(gini_ac_access),
     }
     try:
-        res = requests.post(url, headers=headers, json=payload, timeout=15)
+        res = http_session().post(url, headers=headers, json=payload, timeout=HTTP_TIMEOUT)
         if res.status_code not in (200, 201):
             return None, f"HTTP {res.status_code}: {res.text}"
         return int(res.json()[0]["id"]), None
@@ -150,33 +308,166 @@ def save_generated_schedule(
         return None, f"Connection error: {e}"
 
 
-def save_schedule_slots(schedule_id: int, chromosome: list) -> tuple:
+GENERATED_SLOT_COLUMNS = "slot_id, professor_id, room_id, day_of_week, start_hour, end_hour"
+
+
+def save_generated_schedule_slots(schedule_id: int, chromosome: list) -> tuple:
+    rows = [
+        {
+            "schedule_id":  schedule_id,
+            "slot_id":      int(gene["slot_id"]),
+            "course_id":    int(gene["slot_id"]),
+            "professor_id": int(gene["professor_id"]),
+            "room_id":      str(gene["room_id"]),
+            "day_of_week":  gene["day_of_week"],
+            "start_hour":   gene["start_hour"],
+            "end_hour":     gene["end_hour"],
+        }
+        for gene in chromosome
+    ]
+    errors = []
+    for i in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        chunk = rows[i:i + UPSERT_CHUNK_SIZE]
+        try:
+            execute(client().table("generated_schedule_slots").insert(chunk), idempotent=False)
+        except Exception as e:
+            errors.append(f"rows {i}..{i + len(chunk) - 1}: {e}")
+
+    if errors:
+        return None, " | ".join(errors)
+    return True, None
+
+
+def get_generated_schedule(schedule_id: int):
+    try:
+        rows = execute(
+            client().table("generated_schedules")
+            .select("*")
+            .eq("id", schedule_id)
+            .limit(1)
+        ).data or []
+        return rows[0] if rows else None
+    except Exception as e:
+        print(f"[DB] get_generated_schedule: {e}")
+        return None
+
+
+def get_generated_schedule_slots(schedule_id: int) -> list:
+    try:
+        return execute(
+            client().table("generated_schedule_slots")
+            .select(GENERATED_SLOT_COLUMNS)
+            .eq("schedule_id", schedule_id)
+            .order("slot_id")
+        ).data or []
+    except Exception as e:
+        print(f"[DB] get_generated_schedule_slots: {e}")
+        return []
+
+
+def diff_schedule_slots(old_slots: list, new_slots: list) -> dict:
+    fields  = ("room_id", "day_of_week", "start_hour", "end_hour")
+    old_by  = {s["slot_id"]: s for s in old_slots if s["slot_id"] is not None}
+    new_by  = {s["slot_id"]: s for s in new_slots if s["slot_id"] is not None}
+    changed = []
+    for slot_id, new in new_by.items():
+        old = old_by.get(slot_id)
+        if old is not None and any(old[f] != new[f] for f in fields):
+            changed.append({
+                "slot_id":      slot_id,
+                "professor_id": new["professor_id"],
+                "before":       {f: old[f] for f in fields},
+                "after":        {f: new[f] for f in fields},
+            })
+    return {
+        "changed":   changed,
+        "added":     [s for k, s in new_by.items() if k not in old_by],
+        "removed":   [s for k, s in old_by.items() if k not in new_by],
+        "unchanged": sum(1 for k in new_by if k in old_by) - len(changed),
+    }
+
+
+SLOT_COLUMNS = ("room", "hour", "end_hour", "day_of_week")
+
+
+def changed_slot_rows(chromosome: list, current_rows: list) -> list:
+    # id plus the four GA-owned columns for the genes whose room, hours or
+    # day differ from what was loaded; genes whose slot is unknown are skipped.
+    by_id   = {str(r["id"]): r for r in current_rows}
+    changed = []
+    for gene in chromosome:
+        row = by_id.get(str(gene.get("slot_id")))
+        if row is None:
+            continue
+        update_data = {
+            "room":        str(gene["room_id"]),
+            "hour":        gene["start_hour"],
+            "end_hour":    gene["end_hour"],
+            "day_of_week": gene["day_of_week"],
+        }
+        if any(str(row.get(k)) != str(v) for k, v in update_data.items()):
+            changed.append({"id": row["id"], **update_data})
+    return changed
+
+
+def save_schedule_slots(schedule_id: int, chromosome: list, current_rows: list = None) -> tuple:
+    # Update-only: the admin panel stays usable during a run, so the write
+    # must neither touch other columns nor re-insert slots deleted meanwhile.
     if not chromosome:
         return None, "chromosome is empty"
 
+    if current_rows is None:
+        current_rows = get_all_timetable_slots()
+
+    rows    = changed_slot_rows(chromosome, current_rows)
     errors  = []
     updated = 0
 
-    for gene in chromosome:
-        slot_id = gene.get("slot_id")
-        if not slot_id:
-            continue
+    for i in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        chunk = rows[i:i + UPSERT_CHUNK_SIZE]
         try:
-            # Always write back what the GA resolved
-            update_data = {
-                "room":        str(gene["room_id"]),
-                "hour":        gene["start_hour"],
-                "end_hour":    gene["end_hour"],
-                "day_of_week": gene["day_of_week"],
-            }
-
-            supabase.table("timetable_slots").update(update_data).eq("id", slot_id).execute()
-            updated += 1
+            # one UPDATE ... FROM per chunk, see migration_update_timetable_slots.sql
+            updated += int(execute(client().rpc("update_timetable_slots", {"slot_rows": chunk})).data or 0)
+            continue
         except Exception as e:
-            errors.append(f"slot {slot_id}: {e}")
-
-    print(f"[DB] Updated {updated}/{len(chromosome)} slots")
+            print(f"[DB] update_timetable_slots unavailable, updating row by row: {e}")
+        for row in chunk:
+            try:
+                res = execute(
+                    client().table("timetable_slots")
+                    .update({k: row[k] for k in SLOT_COLUMNS})
+                    .eq("id", row["id"])
+                )
+                updated += len(res.data or [])
+            except Exception as e:
+                errors.append(f"slot {row['id']}: {e}")
+
+    print(f"[DB] Updated {updated}/{len(rows)} changed slots ({len(chromosome) - updated} unchanged or missing)")
 
     if errors:
         return None, " | ".join(errors)
-    return True, None
\ No newline at end of file
+    return True, None
+
+
+# Everything the engine and API need from storage; a backend module provides
+# all of these with the same signatures and return conventions.
+STORAGE_INTERFACE = (
+    "get_all_professors",
+    "get_all_rooms",
+    "get_all_timetable_slots",
+    "get_data_version",
+    "get_schedules_version",
+    "get_timetable_slots",
+    "get_generated_schedules",
+    "get_generated_schedule",
+    "get_generated_schedule_slots",
+    "save_generated_schedule",
+    "save_generated_schedule_slots",
+    "save_schedule_slots",
+)
+
+if STORAGE_BACKEND == "sqlite":
+    import sqlite_store
+    globals().update({name: getattr(sqlite_store, name) for name in STORAGE_INTERFACE})
+elif STORAGE_BACKEND != "supabase":
+    raise RuntimeError(f"Unknown STORAGE_BACKEND {STORAGE_BACKEND!r}; expected 'supabase' or 'sqlite'.")
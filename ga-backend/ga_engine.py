@@ -1,10 +1,16 @@
-import os, random, time
-from collections import defaultdict
+import os, time
+import hashlib
+import secrets
+import multiprocessing
+import queue
+import threading
+from collections import OrderedDict
+import numpy as np
 from dotenv import load_dotenv
 import database
+import metrics
 
 load_dotenv()
-random.seed(time.time())
 
 POPULATION_SIZE    = int(os.getenv("POPULATION_SIZE",   50))
 MAX_GENERATIONS    = int(os.getenv("MAX_GENERATIONS",  200))
@@ -12,6 +18,31 @@ CROSSOVER_PROB     = float(os.getenv("CROSSOVER_PROB", 0.80))
 MUTATION_RATE_INIT = float(os.getenv("MUTATION_RATE",  0.15))
 ELITISM_COUNT      = max(1, int(POPULATION_SIZE * 0.10))
 TOURNAMENT_SIZE    = 5
+DELTA_EVAL         = os.getenv("GA_DELTA_EVAL", "0") == "1"
+WORKERS            = int(os.getenv("GA_WORKERS",        1))
+CHUNK_SIZE         = int(os.getenv("GA_CHUNK_SIZE",     0))
+MIGRATION_INTERVAL = int(os.getenv("GA_MIGRATION_INTERVAL", 10))
+MIGRANTS           = int(os.getenv("GA_MIGRANTS",        2))
+ISLAND_TOPOLOGIES  = ("ring", "full")
+GA_PHASES          = ("evaluation", "selection", "crossover", "mutation", "repair", "local_search")
+SNAPSHOT_TTL       = float(os.getenv("GA_SNAPSHOT_TTL",  300))
+
+# Stopping criteria; each is off at its default (-1 / 0).
+STOP_VIOLATIONS    = int(os.getenv("GA_STOP_VIOLATIONS",  -1))
+STAGNATION_WINDOW  = int(os.getenv("GA_STAGNATION_WINDOW", 0))
+IMPROVEMENT_EPS    = float(os.getenv("GA_IMPROVEMENT_EPS", 0))
+TIME_BUDGET        = float(os.getenv("GA_TIME_BUDGET",     0))
+WARM_PERTURBATION  = float(os.getenv("GA_WARM_PERTURBATION", 0.05))
+REPAIR_RATE        = float(os.getenv("GA_REPAIR_RATE",   1.0))
+REPAIR_GENES       = int(os.getenv("GA_REPAIR_GENES",     0))   # 0: every clashing gene
+LOCAL_SEARCH_EVERY = int(os.getenv("GA_LOCAL_SEARCH_EVERY", 1))  # 0: off
+LOCAL_SEARCH_STEPS = int(os.getenv("GA_LOCAL_SEARCH_STEPS", 100))
+LOCAL_SEARCH_ROOMS = int(os.getenv("GA_LOCAL_SEARCH_ROOMS", 64))
+FITNESS_CACHE_SIZE = int(os.getenv("GA_FITNESS_CACHE",  1024))  # 0: off
+DECOMPOSE          = os.getenv("GA_DECOMPOSE", "0") == "1"
+DECOMPOSE_PARTS    = int(os.getenv("GA_DECOMPOSE_PARTS",   0))   # 0: one per CPU
+RECONCILE_PASSES   = int(os.getenv("GA_RECONCILE_PASSES",  2))
+ALLOW_INFEASIBLE   = os.getenv("GA_ALLOW_INFEASIBLE", "0") == "1"
 
 W_HARD   = 1_000_000
 W_GINI_W =       500
@@ -24,23 +55,79 @@ SCHEDULE_START = 8
 SCHEDULE_END   = 19
 AC_ROOM_BIAS   = 0.70
 
+# A chromosome is a (GENE_FIELDS, n_classes) int array; column i is class i.
+ROOM, DAY, START, END = range(4)
+GENE_FIELDS = 4
+GENE_DTYPE  = np.int32
+
 
 def gini(values: list) -> float:
-    n = len(values)
-    if n < 2:
+    if len(values) < 2:
         return 0.0
-    mean = sum(values) / n
-    if mean == 0:
-        return 0.0
-    total = sum(abs(values[i] - values[j]) for i in range(n) for j in range(n))
-    return total / (2.0 * n * n * mean)
+    return float(gini_batch(np.asarray(values, dtype=float)[None])[0])
+
+
+def gini_batch(values: np.ndarray) -> np.ndarray:
+    # Row-wise Gini of a 2-D array. With each row sorted ascending,
+    # sum_ij |x_i - x_j| = 2 * sum_i (2i - n + 1) * x_i, so one sort and a
+    # weighted sum replace the O(n^2) pairwise loop.
+    m, n = values.shape
+    if n < 2:
+        return np.zeros(m)
+    xs    = np.sort(values, axis=1)
+    total = xs.sum(axis=1)
+    num   = xs @ (2.0 * np.arange(n) - n + 1)
+    out   = np.zeros(m)
+    np.divide(num, n * total, out=out, where=total != 0)
+    return out
+
+
+_snapshot      = {}
+_snapshot_lock = threading.Lock()
+
+
+def problem_rows() -> tuple:
+    # (professors, rooms, slots) from a process-wide snapshot. A snapshot is
+    # reused until SNAPSHOT_TTL expires or the cheap per-table version check
+    # (row count + latest updated_at) reports a change.
+    global _snapshot
+    with _snapshot_lock:
+        version = database.get_data_version() if SNAPSHOT_TTL > 0 else None
+        if (
+            _snapshot
+            and version is not None
+            and version == _snapshot["version"]
+            and time.monotonic() - _snapshot["loaded_at"] < SNAPSHOT_TTL
+        ):
+            return _snapshot["rows"]
+
+        rows = (
+            database.get_all_professors(),
+            database.get_all_rooms(),
+            database.get_all_timetable_slots(),
+        )
+        # The loaders return [] on a failed read; an empty table whose
+        # version still counts rows is such a failure and is not kept.
+        if version is None or any(not r and v[1] for r, v in zip(rows, version)):
+            _snapshot = {}
+            return rows
+        _snapshot = {"version": version, "loaded_at": time.monotonic(), "rows": rows, "data": None}
+        return rows
 
 
 def load_data() -> dict:
-    professors = database.get_all_professors()
-    rooms_raw  = database.get_all_rooms()
-    slots      = database.get_all_timetable_slots()
+    rows = problem_rows()
+    with _snapshot_lock:
+        if _snapshot.get("rows") is rows and _snapshot["data"] is not None:
+            return _snapshot["data"]
+    data = prepare_data(*rows)
+    with _snapshot_lock:
+        if _snapshot.get("rows") is rows:
+            _snapshot["data"] = data
+    return data
 
+
+def prepare_data(professors: list, rooms_raw: list, slots: list) -> dict:
     if not professors:
         raise RuntimeError("No professors in DB.")
     if not rooms_raw:
@@ -87,156 +174,848 @@ def load_data() -> dict:
             "duration":     duration,
         })
 
-    return {
+    data = {
         "rooms":      schedulable,
         "ac_rooms":   ac_rooms,
         "classes":    classes,
         "professors": professors,
+        "slots":      slots,
+    }
+    data.update(intern_ids(data))
+    return ProblemContext(data)
+
+
+class ProblemContext(dict):
+    # The prepared problem: raw rows plus every index map and per-class /
+    # per-room array the operators need, built once per snapshot and shared
+    # by runs, pool workers and islands. Read-only once built, so one run
+    # cannot change what another (or the cached snapshot) sees.
+    def __init__(self, data: dict):
+        super().__init__(data)
+        for value in self.values():
+            if isinstance(value, np.ndarray):
+                value.setflags(write=False)
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("ProblemContext is read-only; copy arrays before modifying them.")
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return ProblemContext, (dict(self),)
+
+
+def intern_ids(data: dict) -> dict:
+    # Slot, professor and room IDs become small ints once per run; a class's
+    # slot index is its position in data["classes"].
+    classes  = data["classes"]
+    room_ids = [r["id"] for r in data["rooms"]]
+    prof_ids = list(dict.fromkeys(
+        [str(p["id"]) for p in data["professors"]] + [c["professor_id"] for c in classes]
+    ))
+    prof_idx = {pid: i for i, pid in enumerate(prof_ids)}
+
+    cls_prof     = np.array([prof_idx[c["professor_id"]] for c in classes], dtype=GENE_DTYPE)
+    cls_needs_ac = np.array([c["needs_ac"] for c in classes], dtype=bool)
+    cls_ai       = np.array([c["ai_assign"] for c in classes], dtype=bool)
+    cls_duration = np.array([c["duration"] for c in classes], dtype=GENE_DTYPE)
+
+    template = np.empty((GENE_FIELDS, len(classes)), dtype=GENE_DTYPE)
+    template[ROOM]  = 0
+    template[DAY]   = [c["day_of_week"] for c in classes]
+    template[START] = [c["start_hour"] for c in classes]
+    template[END]   = [c["end_hour"] for c in classes]
+
+    max_start = np.maximum(SCHEDULE_START, SCHEDULE_END - cls_duration)
+    hours     = np.concatenate([template[START], template[END], [SCHEDULE_START, SCHEDULE_END]])
+    hour_lo   = int(hours.min())
+    n_hours   = int(hours.max() - hours.min()) + 1
+    n_days    = int(template[DAY].max() - template[DAY].min()) + 1
+
+    # valid start offsets (hour - hour_lo) per class; classes with the same
+    # latest start share one array
+    starts = {m: np.arange(SCHEDULE_START, m + 1, dtype=GENE_DTYPE) - hour_lo for m in np.unique(max_start).tolist()}
+    for arr in starts.values():
+        arr.setflags(write=False)
+
+    # Fixed classes never move: their professor occupancy per (day, hour)
+    # cell is the same in every chromosome, and so is every clash among them.
+    n_cells = n_days * n_hours
+    fixed   = np.flatnonzero(~cls_ai)
+    grid    = {"day_lo": int(template[DAY].min()), "n_hours": n_hours, "hour_lo": hour_lo}
+    _, fi, fcell = hour_cells(template[None][:, :, fixed], grid)
+    fi          = fixed[fi]
+    fixed_prof  = np.bincount(cls_prof[fi].astype(np.int64) * n_cells + fcell,
+                              minlength=len(prof_ids) * n_cells).astype(GENE_DTYPE)
+    fixed_cells = np.bincount(fcell, minlength=n_cells).astype(GENE_DTYPE)
+    n_rooms     = len(room_ids)
+
+    ac_prof_idx = np.unique(cls_prof[cls_needs_ac])
+    prof_ac_pos = np.full(len(prof_ids), -1, dtype=GENE_DTYPE)
+    prof_ac_pos[ac_prof_idx] = np.arange(len(ac_prof_idx))
+
+    return {
+        "room_ids":     room_ids,
+        "room_index":   {rid: i for i, rid in enumerate(room_ids)},
+        "slot_index":   {c["slot_id"]: i for i, c in enumerate(classes)},
+        "room_is_ac":   np.array([r["is_ac"] for r in data["rooms"]], dtype=bool),
+        "ac_room_idx":  np.array([i for i, r in enumerate(data["rooms"]) if r["is_ac"]], dtype=GENE_DTYPE),
+        "prof_ids":     prof_ids,
+        "ac_prof_idx":  ac_prof_idx,
+        "prof_ac_pos":  prof_ac_pos,
+        "cls_prof":     cls_prof,
+        "cls_needs_ac": cls_needs_ac,
+        "cls_ai":       cls_ai,
+        "cls_duration": cls_duration,
+        "cls_max_start": max_start.astype(GENE_DTYPE),
+        "cls_starts":   tuple(starts[m] for m in max_start.tolist()),
+        "template":     template,
+        "day_lo":       int(template[DAY].min()),
+        "n_days":       n_days,
+        "hour_lo":      hour_lo,
+        "n_hours":      n_hours,
+        "n_cells":      n_cells,
+        "fixed_prof":   fixed_prof,
+        "prof_free":    fixed_prof == 0,
+        "fixed_cells":  fixed_cells,
+        "prof_floor":   int(np.maximum(fixed_prof - 1, 0).sum()),
+        "room_bound":   int(np.maximum(fixed_cells - n_rooms, 0).sum()),
     }
 
 
-def pick_room(needs_ac: bool, data: dict) -> dict:
-    if needs_ac and data["ac_rooms"] and random.random() < AC_ROOM_BIAS:
-        return random.choice(data["ac_rooms"])
-    return random.choice(data["rooms"])
+def decode(chrom: np.ndarray, data: dict) -> list:
+    room_ids = data["room_ids"]
+    genes = []
+    for i, cls in enumerate(data["classes"]):
+        genes.append({
+            "slot_id":      cls["slot_id"],
+            "professor_id": cls["professor_id"],
+            "needs_ac":     cls["needs_ac"],
+            "ai_assign":    cls["ai_assign"],
+            "day_of_week":  int(chrom[DAY, i]),
+            "start_hour":   int(chrom[START, i]),
+            "end_hour":     int(chrom[END, i]),
+            "room_id":      room_ids[chrom[ROOM, i]],
+        })
+    return genes
+
+
+def pick_rooms(needs_ac: np.ndarray, data: dict, rng: np.random.Generator) -> np.ndarray:
+    rooms = rng.integers(len(data["room_ids"]), size=len(needs_ac)).astype(GENE_DTYPE)
+    ac_idx = data["ac_room_idx"]
+    if len(ac_idx):
+        use_ac = needs_ac & (rng.random(len(needs_ac)) < AC_ROOM_BIAS)
+        rooms[use_ac] = ac_idx[rng.integers(len(ac_idx), size=int(use_ac.sum()))]
+    return rooms
+
+
+def pick_hours(idx: np.ndarray, data: dict, rng: np.random.Generator) -> tuple:
+    # day_of_week is intentionally left unchanged
+    start = rng.integers(SCHEDULE_START, data["cls_max_start"][idx] + 1).astype(GENE_DTYPE)
+    end   = np.minimum(start + data["cls_duration"][idx], SCHEDULE_END)
+    return start, end
+
 
+def random_chromosome(data: dict, rng: np.random.Generator) -> np.ndarray:
+    chrom = data["template"].copy()
+    chrom[ROOM] = pick_rooms(data["cls_needs_ac"], data, rng)
+    ai = np.flatnonzero(data["cls_ai"])
+    if len(ai):
+        chrom[START, ai], chrom[END, ai] = pick_hours(ai, data, rng)
+    return chrom
 
-def random_gene(cls: dict, data: dict) -> dict:
-    room = pick_room(cls["needs_ac"], data)
 
-    if cls["ai_assign"]:
-        duration = cls["duration"]
-        max_start = max(SCHEDULE_START, SCHEDULE_END - duration)
-        start = random.randint(SCHEDULE_START, max_start)
-        end   = min(start + duration, SCHEDULE_END)
-        day   = cls["day_of_week"]   # respect user's chosen day
+def init_population(data: dict, rng: np.random.Generator) -> list:
+    return [random_chromosome(data, rng) for _ in range(POPULATION_SIZE)]
+
+
+def cell_keys(chrom: np.ndarray, data: dict) -> tuple:
+    # (class index, professor cell key, room cell key) per occupied class-hour
+    n_cells = data["n_cells"]
+    _, gi, cell = hour_cells(chrom[None], data)
+    return (
+        gi,
+        data["cls_prof"][gi].astype(np.int64) * n_cells + cell,
+        (len(data["prof_ids"]) + chrom[ROOM, gi].astype(np.int64)) * n_cells + cell,
+    )
+
+
+def conflict_neighbourhood(chrom: np.ndarray, changed: np.ndarray, data: dict) -> np.ndarray:
+    # Changed classes, every class sharing a professor or room hour with one
+    # of them, and every class already involved in a clash.
+    gi, prof_keys, room_keys = cell_keys(chrom, data)
+    keys    = np.concatenate([prof_keys, room_keys])
+    owners  = np.concatenate([gi, gi])
+    touched = np.isin(keys, keys[changed[owners]])
+    _, inv, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    mask = changed.copy()
+    mask[owners[touched | (counts[inv] > 1)]] = True
+    return mask
+
+
+def warm_start_seed(data: dict, rng: np.random.Generator, schedule_id: int = None,
+                    restrict: bool = False) -> dict:
+    # Seed chromosome from the live timetable_slots rows or from a stored
+    # generated schedule. Slots with no usable stored assignment (new, room
+    # removed, fixed hours edited since the schedule) count as changed and
+    # get fresh random genes.
+    room_idx = data["room_index"]
+    chrom    = data["template"].copy()
+    changed  = np.zeros(len(data["classes"]), dtype=bool)
+
+    if schedule_id is None:
+        for i, slot in enumerate(data["slots"]):
+            room = room_idx.get(str(slot.get("room") or ""))
+            if room is None:
+                changed[i] = True
+            else:
+                chrom[ROOM, i] = room
     else:
-        start = cls["start_hour"]
-        end   = cls["end_hour"]
-        day   = cls["day_of_week"]
+        rows = database.get_generated_schedule_slots(schedule_id)
+        if not rows:
+            raise ValueError(f"Schedule {schedule_id} has no stored slots to warm-start from.")
+        stored = {str(r["slot_id"]): r for r in rows}
+        for i, cls in enumerate(data["classes"]):
+            row  = stored.get(cls["slot_id"])
+            room = room_idx.get(str(row["room_id"])) if row else None
+            if room is None or int(row["day_of_week"]) != cls["day_of_week"]:
+                changed[i] = True
+                continue
+            chrom[ROOM, i] = room
+            if cls["ai_assign"]:
+                chrom[START, i], chrom[END, i] = row["start_hour"], row["end_hour"]
+            elif (row["start_hour"], row["end_hour"]) != (cls["start_hour"], cls["end_hour"]):
+                changed[i] = True
 
+    ai = data["cls_ai"]
+    changed |= ai & (
+        (chrom[START] < SCHEDULE_START)
+        | (chrom[START] > data["cls_max_start"])
+        | (chrom[END] - chrom[START] != data["cls_duration"])
+    )
+    reseed(chrom, changed, data, rng)
     return {
-        "slot_id":      cls["slot_id"],
-        "professor_id": cls["professor_id"],
-        "needs_ac":     cls["needs_ac"],
-        "ai_assign":    cls["ai_assign"],
-        "day_of_week":  day,
-        "start_hour":   start,
-        "end_hour":     end,
-        "room_id":      room["id"],
+        "chrom":   chrom,
+        "changed": changed,
+        "mutable": conflict_neighbourhood(chrom, changed, data) if restrict else None,
+        "source":  "current" if schedule_id is None else f"schedule:{schedule_id}",
     }
 
 
-def init_population(data: dict) -> list:
-    return [
-        [random_gene(c, data) for c in data["classes"]]
-        for _ in range(POPULATION_SIZE)
+def reseed(chrom: np.ndarray, changed: np.ndarray, data: dict, rng: np.random.Generator) -> None:
+    idx = np.flatnonzero(changed)
+    if len(idx):
+        chrom[ROOM, idx] = pick_rooms(data["cls_needs_ac"][idx], data, rng)
+    idx = np.flatnonzero(changed & data["cls_ai"])
+    if len(idx):
+        chrom[START, idx], chrom[END, idx] = pick_hours(idx, data, rng)
+
+
+def warm_population(warm: dict, data: dict, rng: np.random.Generator) -> list:
+    # The seed itself plus perturbed copies: changed genes re-drawn, the rest
+    # mutated lightly (only within warm["mutable"] when restricted).
+    kids = np.repeat(warm["chrom"][None], POPULATION_SIZE - 1, axis=0)
+    for chrom in kids:
+        reseed(chrom, warm["changed"], data, rng)
+    mutate_batch(kids, WARM_PERTURBATION, data, rng, warm["mutable"])
+    return [warm["chrom"].copy()] + list(kids)
+
+
+def hour_cells(pop: np.ndarray, data: dict) -> tuple:
+    # One entry per occupied class-hour across the population matrix:
+    # (chromosome index, class index, day/hour cell index).
+    start, end = pop[:, START], pop[:, END]
+    span  = int((end - start).max(initial=0))
+    hours = start[..., None] + np.arange(max(span, 0), dtype=GENE_DTYPE)
+    pi, gi, k = np.nonzero(hours < end[..., None])
+    day   = pop[pi, DAY, gi].astype(np.int64) - data["day_lo"]
+    cell  = day * data["n_hours"] + (hours[pi, gi, k] - data["hour_lo"])
+    return pi, gi, cell
+
+
+def clashes(pi: np.ndarray, owner: np.ndarray, cell: np.ndarray, n_owners: int, n_pop: int, n_cells: int) -> np.ndarray:
+    occ = np.bincount(
+        (pi * n_owners + owner) * n_cells + cell, minlength=n_pop * n_owners * n_cells
+    ).reshape(n_pop, -1)
+    return np.maximum(occ - 1, 0).sum(axis=1)
+
+
+def prof_clashes(pi: np.ndarray, gi: np.ndarray, cell: np.ndarray, data: dict, n_pop: int) -> np.ndarray:
+    # Clashes among fixed classes are the constant prof_floor, so only
+    # AI-assigned hours are counted per chromosome: each costs one clash,
+    # less one per (professor, cell) they occupy that no fixed class holds.
+    ai   = data["cls_ai"][gi]
+    pi   = pi[ai]
+    n    = len(data["prof_ids"]) * data["n_cells"]
+    keys = (pi * len(data["prof_ids"]) + data["cls_prof"][gi[ai]]) * data["n_cells"] + cell[ai]
+    occ  = np.bincount(keys, minlength=n_pop * n).reshape(n_pop, n)
+    return data["prof_floor"] + np.bincount(pi, minlength=n_pop) - ((occ > 0) & data["prof_free"]).sum(axis=1)
+
+
+def hard_violations(pop: np.ndarray, data: dict) -> np.ndarray:
+    n_pop   = len(pop)
+    n_cells = data["n_cells"]
+    pi, gi, cell = hour_cells(pop, data)
+    rooms = pop[pi, ROOM, gi].astype(np.int64)
+    return (
+        prof_clashes(pi, gi, cell, data, n_pop)
+        + clashes(pi, rooms, cell, len(data["room_ids"]), n_pop, n_cells)
+    )
+
+
+def pre_analysis(data: dict) -> dict:
+    # What the fixed slots alone force on every schedule: professor
+    # double-bookings among them (a constant part of hard_violations) and
+    # (day, hour) cells with more fixed classes than rooms (at least the
+    # excess are room clashes). A positive lower bound proves that no
+    # clash-free schedule exists; the listed slots are the ones to edit.
+    n_hours, n_cells = data["n_hours"], data["n_cells"]
+    fixed = np.flatnonzero(~data["cls_ai"])
+    _, fi, cell = hour_cells(data["template"][None][:, :, fixed], data)
+    fi    = fixed[fi]
+    prof  = data["cls_prof"][fi]
+    slots = data["slots"]
+
+    def when(c: int) -> tuple:
+        return c // n_hours + data["day_lo"], c % n_hours + data["hour_lo"]
+
+    groups = {}
+    for i, p, c in zip(fi.tolist(), prof.tolist(), cell.tolist()):
+        if data["fixed_prof"][p * n_cells + c] > 1:
+            day, hour = when(c)
+            g = groups.setdefault((p, day), {"hours": set(), "slot_ids": set()})
+            g["hours"].add(hour)
+            g["slot_ids"].add(slots[i]["id"])
+    professor_clashes = [
+        {
+            "professor_id": data["prof_ids"][p],
+            "day_of_week":  day,
+            "hours":        sorted(g["hours"]),
+            "slot_ids":     sorted(g["slot_ids"]),
+        }
+        for (p, day), g in sorted(groups.items())
     ]
 
+    n_rooms = len(data["room_ids"])
+    over    = np.flatnonzero(data["fixed_cells"] > n_rooms)
+    room_overflows = [
+        {
+            "day_of_week": when(c)[0],
+            "hour":        when(c)[1],
+            "classes":     int(data["fixed_cells"][c]),
+            "rooms":       n_rooms,
+            "slot_ids":    sorted(slots[i]["id"] for i in fi[cell == c].tolist()),
+        }
+        for c in over.tolist()
+    ]
 
-def hard_violations(chrom: list) -> int:
-    v, ps, rs = 0, set(), set()
-    for g in chrom:
-        for h in range(g["start_hour"], g["end_hour"]):
-            pk = (g["day_of_week"], h, g["professor_id"])
-            rk = (g["day_of_week"], h, g["room_id"])
-            if pk in ps:
-                v += 1
-            else:
-                ps.add(pk)
-            if rk in rs:
-                v += 1
-            else:
-                rs.add(rk)
-    return v
+    lower_bound = data["prof_floor"] + data["room_bound"]
+    return {
+        "feasible":          lower_bound == 0,
+        "lower_bound":       lower_bound,
+        "professor_floor":   data["prof_floor"],
+        "room_bound":        data["room_bound"],
+        "professor_clashes": professor_clashes,
+        "room_overflows":    room_overflows,
+    }
 
 
-def gini_workload(chrom: list, professors: list) -> float:
-    hrs = defaultdict(float)
-    for g in chrom:
-        hrs[g["professor_id"]] += g["end_hour"] - g["start_hour"]
-    for p in professors:
-        hrs.setdefault(str(p["id"]), 0.0)
-    return gini(list(hrs.values()))
+def hour_totals(pop: np.ndarray, owner: np.ndarray, n_owners: int, weights: np.ndarray) -> np.ndarray:
+    n_pop = len(pop)
+    keys  = np.arange(n_pop)[:, None] * n_owners + owner
+    return np.bincount(
+        keys.ravel(), weights=weights.ravel(), minlength=n_pop * n_owners
+    ).reshape(n_pop, n_owners)
 
 
-def gini_room_usage(chrom: list, rooms: list) -> float:
-    hrs = defaultdict(float)
-    for g in chrom:
-        hrs[g["room_id"]] += g["end_hour"] - g["start_hour"]
-    for r in rooms:
-        hrs.setdefault(str(r["id"]), 0.0)
-    return gini(list(hrs.values()))
+def gini_rows(hrs: np.ndarray) -> list:
+    return gini_batch(hrs).tolist()
 
 
-def gini_ac_access(chrom: list, room_lookup: dict) -> float:
-    all_prof_ids = {g["professor_id"] for g in chrom}
-    if not all_prof_ids:
-        return 0.0
+def gini_workload(pop: np.ndarray, data: dict) -> list:
+    owner = np.broadcast_to(data["cls_prof"], pop[:, ROOM].shape)
+    return gini_rows(hour_totals(pop, owner, len(data["prof_ids"]), pop[:, END] - pop[:, START]))
 
-    ac_hrs = {pid: 0.0 for pid in all_prof_ids}
-    for g in chrom:
-        pid = g["professor_id"]
-        if room_lookup.get(g["room_id"], {}).get("is_ac"):
-            ac_hrs[pid] += g["end_hour"] - g["start_hour"]
 
-    profs_needing_ac = {g["professor_id"] for g in chrom if g["needs_ac"]}
-    if not profs_needing_ac:
-        return 0.0
+def gini_room_usage(pop: np.ndarray, data: dict) -> list:
+    return gini_rows(hour_totals(pop, pop[:, ROOM], len(data["room_ids"]), pop[:, END] - pop[:, START]))
+
 
-    return gini([ac_hrs[pid] for pid in profs_needing_ac])
+def gini_ac_access(pop: np.ndarray, data: dict) -> list:
+    if not len(data["ac_prof_idx"]):
+        return [0.0] * len(pop)
+    owner  = np.broadcast_to(data["cls_prof"], pop[:, ROOM].shape)
+    in_ac  = data["room_is_ac"][pop[:, ROOM]]
+    ac_hrs = hour_totals(pop, owner, len(data["prof_ids"]), (pop[:, END] - pop[:, START]) * in_ac)
+    return gini_rows(ac_hrs[:, data["ac_prof_idx"]])
 
 
-def fitness(chrom: list, data: dict) -> tuple:
-    rl  = {r["id"]: r for r in data["rooms"]}
-    hv  = hard_violations(chrom)
-    gw  = gini_workload(chrom, data["professors"])
-    gr  = gini_room_usage(chrom, data["rooms"])
-    ga  = gini_ac_access(chrom, rl)
-    bon = sum(1 for g in chrom if g["needs_ac"] and rl.get(g["room_id"], {}).get("is_ac"))
+def evaluate_population(pop: list, data: dict) -> list:
+    mat = np.stack(pop)
+    hvs = hard_violations(mat, data).tolist()
+    gws = gini_workload(mat, data)
+    grs = gini_room_usage(mat, data)
+    gas = gini_ac_access(mat, data)
+    bns = (data["cls_needs_ac"] & data["room_is_ac"][mat[:, ROOM]]).sum(axis=1).tolist()
+    return [weighted_score(*e) for e in zip(hvs, gws, grs, gas, bns)]
+
+
+def weighted_score(hv: int, gw: float, gr: float, ga: float, bon: int) -> tuple:
     score = -W_HARD * hv - W_GINI_W * gw - W_GINI_R * gr - W_GINI_A * ga + W_AC_BON * bon
     return score, hv, gw, gr, ga
 
 
-def tournament(pop: list, fits: list) -> list:
-    sample = random.sample(list(zip(pop, fits)), min(TOURNAMENT_SIZE, len(pop)))
-    return max(sample, key=lambda x: x[1])[0]
+def fitness(chrom: np.ndarray, data: dict) -> tuple:
+    return evaluate_population([chrom], data)[0]
+
+
+class FitnessCache:
+    # Bounded LRU of fitness tuples keyed by a 128-bit digest of the
+    # chromosome bytes, so carried-over elites and unmutated clones are
+    # not scored again. One cache per evolve() call.
+    def __init__(self, size: int = FITNESS_CACHE_SIZE):
+        self.size    = size
+        self.entries = OrderedDict()
+        self.hits    = 0
+        self.misses  = 0
+
+    @staticmethod
+    def key(chrom: np.ndarray) -> bytes:
+        return hashlib.blake2b(chrom.tobytes(), digest_size=16).digest()
+
+    def put(self, key: bytes, ev: tuple) -> None:
+        if not self.size:
+            return
+        self.entries[key] = ev
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def evaluate(self, pop: list, score) -> list:
+        # score(indices) evaluates the listed members of pop in one batch
+        if not self.size:
+            self.misses += len(pop)
+            return score(list(range(len(pop))))
+        keys  = [self.key(c) for c in pop]
+        evals = [None] * len(pop)
+        miss  = {}  # key -> indices in pop; duplicates are scored once
+        for i, k in enumerate(keys):
+            ev = self.entries.get(k)
+            if ev is None:
+                miss.setdefault(k, []).append(i)
+            else:
+                self.entries.move_to_end(k)
+                evals[i] = ev
+        self.hits   += len(pop) - len(miss)
+        self.misses += len(miss)
+        if miss:
+            first = [idx[0] for idx in miss.values()]
+            for (k, idx), ev in zip(miss.items(), score(first)):
+                self.put(k, ev)
+                for i in idx:
+                    evals[i] = ev
+        return evals
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.entries)}
+
+
+def shift_cells(table: np.ndarray, out_keys: np.ndarray, in_keys: np.ndarray) -> int:
+    # Move occupancy counts and return the resulting change in clashes,
+    # looking only at the cells that were touched.
+    flat    = table.reshape(-1)
+    touched = np.unique(np.concatenate([out_keys, in_keys]))
+    before  = int(np.maximum(flat[touched] - 1, 0).sum())
+    np.subtract.at(flat, out_keys, 1)
+    np.add.at(flat, in_keys, 1)
+    return int(np.maximum(flat[touched] - 1, 0).sum()) - before
+
+
+class Occupancy:
+    # Per-chromosome professor/room occupancy per (day, hour) cell plus the
+    # hour totals behind the Gini terms. A child's aggregates are derived
+    # from its parent's by moving only the genes that differ, in
+    # O(changed genes x duration), so scoring it never rescans the
+    # chromosome. Instances are treated as immutable once shared.
+    __slots__ = ("prof", "room", "prof_hrs", "room_hrs", "ac_hrs", "hv", "bonus")
+
+    @classmethod
+    def build(cls, chrom: np.ndarray, data: dict) -> "Occupancy":
+        n_prof  = len(data["prof_ids"])
+        n_rooms = len(data["room_ids"])
+        n_cells = data["n_cells"]
+        pop     = chrom[None]
+        pi, gi, cell = hour_cells(pop, data)
+
+        occ = cls.__new__(cls)
+        occ.prof = np.bincount(
+            data["cls_prof"][gi] * n_cells + cell, minlength=n_prof * n_cells
+        ).reshape(n_prof, n_cells)
+        occ.room = np.bincount(
+            chrom[ROOM, gi].astype(np.int64) * n_cells + cell, minlength=n_rooms * n_cells
+        ).reshape(n_rooms, n_cells)
+        occ.hv = int(np.maximum(occ.prof - 1, 0).sum() + np.maximum(occ.room - 1, 0).sum())
+
+        hrs   = chrom[END] - chrom[START]
+        in_ac = data["room_is_ac"][chrom[ROOM]]
+        occ.prof_hrs = np.bincount(data["cls_prof"], weights=hrs, minlength=n_prof)
+        occ.room_hrs = np.bincount(chrom[ROOM], weights=hrs, minlength=n_rooms)
+        occ.ac_hrs   = np.bincount(data["cls_prof"], weights=hrs * in_ac, minlength=n_prof)
+        occ.bonus    = int((data["cls_needs_ac"] & in_ac).sum())
+        return occ
+
+    def copy(self) -> "Occupancy":
+        occ = Occupancy.__new__(Occupancy)
+        for name in ("prof", "room", "prof_hrs", "room_hrs", "ac_hrs"):
+            setattr(occ, name, getattr(self, name).copy())
+        occ.hv, occ.bonus = self.hv, self.bonus
+        return occ
+
+    def move(self, idx: np.ndarray, old: np.ndarray, new: np.ndarray, data: dict) -> None:
+        # Replace genes idx, currently old[:, k], with new[:, k] in place.
+        n_cells = data["n_cells"]
+        keys = []
+        for genes in (old, new):
+            _, gi, cell = hour_cells(genes[None], data)
+            keys.append((
+                data["cls_prof"][idx[gi]] * n_cells + cell,
+                genes[ROOM, gi].astype(np.int64) * n_cells + cell,
+            ))
+        self.hv += shift_cells(self.prof, keys[0][0], keys[1][0])
+        self.hv += shift_cells(self.room, keys[0][1], keys[1][1])
+
+        prof      = data["cls_prof"][idx]
+        old_hrs   = old[END] - old[START]
+        new_hrs   = new[END] - new[START]
+        old_ac    = data["room_is_ac"][old[ROOM]]
+        new_ac    = data["room_is_ac"][new[ROOM]]
+        needs_ac  = data["cls_needs_ac"][idx]
+        np.add.at(self.prof_hrs, prof, new_hrs - old_hrs)
+        np.subtract.at(self.room_hrs, old[ROOM], old_hrs)
+        np.add.at(self.room_hrs, new[ROOM], new_hrs)
+        np.add.at(self.ac_hrs, prof, new_hrs * new_ac - old_hrs * old_ac)
+        self.bonus += int((needs_ac & new_ac).sum() - (needs_ac & old_ac).sum())
+
+    def relocate(self, i: int, base: int, room: int, lo: int,
+                 new_room: int, new_lo: int, dur: int, data: dict) -> None:
+        # Single-gene move on one day (cells base+lo .. base+lo+dur), cheaper
+        # than move() because the cells are a contiguous slice.
+        prof = data["cls_prof"][i]
+        old  = slice(base + lo, base + lo + dur)
+        new  = slice(base + new_lo, base + new_lo + dur)
+        self.prof[prof, old] -= 1
+        self.room[room, old] -= 1
+        self.hv -= int((self.prof[prof, old] > 0).sum() + (self.room[room, old] > 0).sum())
+        self.hv += int((self.prof[prof, new] > 0).sum() + (self.room[new_room, new] > 0).sum())
+        self.prof[prof, new] += 1
+        self.room[new_room, new] += 1
+
+        ac_gain = int(data["room_is_ac"][new_room]) - int(data["room_is_ac"][room])
+        self.room_hrs[room]     -= dur
+        self.room_hrs[new_room] += dur
+        self.ac_hrs[prof]       += dur * ac_gain
+        if data["cls_needs_ac"][i]:
+            self.bonus += ac_gain
+
+    def derive(self, parent: np.ndarray, child: np.ndarray, data: dict) -> "Occupancy":
+        idx = np.flatnonzero((child != parent).any(axis=0))
+        if not len(idx):
+            return self
+        occ = self.copy()
+        occ.move(idx, parent[:, idx], child[:, idx], data)
+        return occ
+
+    def fitness(self, data: dict) -> tuple:
+        return weighted_score(
+            self.hv,
+            gini(self.prof_hrs),
+            gini(self.room_hrs),
+            gini(self.ac_hrs[data["ac_prof_idx"]]),
+            self.bonus,
+        )
+
+
+def tournaments(fits: np.ndarray, n: int, rng: np.random.Generator) -> np.ndarray:
+    # n independent tournaments at once: each row draws TOURNAMENT_SIZE
+    # distinct contestants (the smallest random keys) and keeps the fittest.
+    size   = min(TOURNAMENT_SIZE, len(fits))
+    sample = np.argpartition(rng.random((n, len(fits))), size - 1, axis=1)[:, :size]
+    return sample[np.arange(n), fits[sample].argmax(axis=1)]
+
+
+def crossover_masks(n_pairs: int, n_genes: int, rng: np.random.Generator) -> np.ndarray:
+    # Uniform crossover: True swaps the gene between the two children.
+    # Fair coins come from random bytes, eight genes per draw; pairs that
+    # skip crossover (1 - CROSSOVER_PROB) swap nothing.
+    bits = rng.integers(256, size=(n_pairs, (n_genes + 7) // 8), dtype=np.uint8)
+    mask = np.unpackbits(bits, axis=1, count=n_genes).view(bool)
+    mask[rng.random(n_pairs) >= CROSSOVER_PROB] = False
+    return mask
 
 
-def crossover(p1: list, p2: list) -> tuple:
-    c1, c2 = [], []
-    for g1, g2 in zip(p1, p2):
-        if random.random() < 0.5:
-            c1.append(g1.copy())
-            c2.append(g2.copy())
+def mutate_batch(kids: np.ndarray, rate: float, data: dict, rng: np.random.Generator,
+                 mutable: np.ndarray = None) -> None:
+    # In-place mutation of a (n, GENE_FIELDS, n_classes) block: one mask for
+    # room resampling, one for AI-assigned start hours, each resampled in bulk.
+    n, _, n_cls = kids.shape
+    hit = rng.random((n, n_cls)) < rate
+    if mutable is not None:
+        hit &= mutable
+    k, i = np.nonzero(hit)
+    if len(i):
+        kids[k, ROOM, i] = pick_rooms(data["cls_needs_ac"][i], data, rng)
+    hit = data["cls_ai"] & (rng.random((n, n_cls)) < rate)
+    if mutable is not None:
+        hit &= mutable
+    k, i = np.nonzero(hit)
+    if len(i):
+        kids[k, START, i], kids[k, END, i] = pick_hours(i, data, rng)
+
+
+def reproduce(pop: list, fits: np.ndarray, n: int, rate: float, data: dict,
+              rng: np.random.Generator, mutable: np.ndarray = None, timings: dict = None) -> tuple:
+    # The next generation's n offspring in one pass over a population matrix:
+    # tournament selection, uniform crossover and mutation are each a single
+    # vectorized step. Returns (children, parents); parents[j] is the
+    # population index child j was crossed from, for Occupancy.derive.
+    clock   = time.perf_counter
+    t0      = clock()
+    n_pairs = (n + 1) // 2
+    parents = tournaments(fits, 2 * n_pairs, rng)   # pair j is (j, n_pairs + j)
+    t1      = clock()
+
+    # kids starts as copies of the parents, first parents then second;
+    # xor-swapping the masked genes of each pair makes the two children
+    kids   = np.stack(pop)[parents]
+    c1, c2 = kids[:n_pairs], kids[n_pairs:]
+    diff   = c1 ^ c2
+    diff  *= crossover_masks(n_pairs, kids.shape[2], rng)[:, None, :]
+    c1    ^= diff
+    c2    ^= diff
+    kids, parents = kids[:n], parents[:n]
+    t2 = clock()
+
+    mutate_batch(kids, rate, data, rng, mutable)
+    if timings is not None:
+        timings["selection"] += t1 - t0
+        timings["crossover"] += t2 - t1
+        timings["mutation"]  += clock() - t2
+    return list(kids), parents.tolist()
+
+
+def free_room(free: np.ndarray, current: int, needs_ac: bool, data: dict, rng: np.random.Generator):
+    # Keep the current room when it is free, else a random free room,
+    # an AC one when the class wants AC and one is available.
+    if free[current]:
+        return current
+    rooms = np.flatnonzero(free)
+    if needs_ac:
+        ac = rooms[data["room_is_ac"][rooms]]
+        rooms = ac if len(ac) else rooms
+    return int(rooms[rng.integers(len(rooms))]) if len(rooms) else None
+
+
+def repair(chrom: np.ndarray, data: dict, rng: np.random.Generator, occ: "Occupancy" = None,
+           mutable: np.ndarray = None, limit: int = 0) -> tuple:
+    # Moves clashing genes (at most `limit` of them when non-zero) to a free room at the same hours or,
+    # for AI-assigned classes, to free hours on the same day, using the
+    # occupancy index instead of blind resampling. Returns (chrom, occ).
+    owned = occ is None
+    occ   = Occupancy.build(chrom, data) if owned else occ
+    if not occ.hv:
+        return chrom, occ
+
+    # A fixed-hours class in a professor clash cannot be moved, so only
+    # room clashes and AI-assigned classes are worth a repair attempt.
+    _, gi, cell = hour_cells(chrom[None], data)
+    prof_clash  = occ.prof[data["cls_prof"][gi], cell] > 1
+    room_clash  = occ.room[chrom[ROOM, gi], cell] > 1
+    bad = np.unique(gi[room_clash | (prof_clash & data["cls_ai"][gi])])
+    if mutable is not None:
+        bad = bad[mutable[bad]]
+    if not len(bad):
+        return chrom, occ
+
+    g       = chrom.copy()
+    n_hours = data["n_hours"]
+    hour_lo = data["hour_lo"]
+    for i in rng.permutation(bad)[:limit or None]:
+        prof, room = data["cls_prof"][i], int(g[ROOM, i])
+        base       = (g[DAY, i] - data["day_lo"]) * n_hours
+        lo, dur    = g[START, i] - hour_lo, g[END, i] - g[START, i]
+        # this day's occupancy with gene i taken out
+        prof_day = occ.prof[prof, base:base + n_hours].copy()
+        room_day = occ.room[:, base:base + n_hours].copy()
+        prof_day[lo:lo + dur] -= 1
+        room_day[room, lo:lo + dur] -= 1
+
+        # A fixed class's professor clash is part of prof_floor and stays
+        # wherever the class sits, so only its room clash decides the move.
+        new_room, new_lo = None, lo
+        if not data["cls_ai"][i] or not prof_day[lo:lo + dur].any():
+            new_room = free_room(~room_day[:, lo:lo + dur].any(axis=1), room, data["cls_needs_ac"][i], data, rng)
+        if new_room is None and data["cls_ai"][i]:
+            starts = data["cls_starts"][i]
+            for s in rng.permutation(starts):
+                if prof_day[s:s + dur].any():
+                    continue
+                new_room = free_room(~room_day[:, s:s + dur].any(axis=1), room, data["cls_needs_ac"][i], data, rng)
+                if new_room is not None:
+                    new_lo = s
+                    break
+        if new_room is None or (new_room == room and new_lo == lo):
+            continue
+
+        if not owned:
+            occ, owned = occ.copy(), True
+        occ.relocate(i, base, room, lo, new_room, new_lo, dur, data)
+        g[ROOM, i]  = new_room
+        g[START, i] = new_lo + hour_lo
+        g[END, i]   = new_lo + hour_lo + dur
+    return g, occ
+
+
+def window_sums(busy: np.ndarray, starts: np.ndarray, dur: int) -> np.ndarray:
+    # busy[..., s:s + dur].sum(-1) for every s in starts
+    cs = np.concatenate([np.zeros(busy.shape[:-1] + (1,), dtype=np.int64), np.cumsum(busy, axis=-1)], axis=-1)
+    return cs[..., starts + dur] - cs[..., starts]
+
+
+def local_search(chrom: np.ndarray, data: dict, rng: np.random.Generator, occ: "Occupancy" = None,
+                 mutable: np.ndarray = None, steps: int = LOCAL_SEARCH_STEPS) -> tuple:
+    # Hill climbing over up to `steps` random genes: each gene takes the best
+    # room (and, for AI-assigned classes, start hour) by exact fitness delta.
+    # A class's hours never change length, so only the clash, room-usage
+    # Gini, AC-access Gini and AC bonus terms can move. Returns (chrom, occ);
+    # chrom is the input object when nothing improved.
+    owned = occ is None
+    occ   = Occupancy.build(chrom, data) if owned else occ
+    genes = np.arange(chrom.shape[1]) if mutable is None else np.flatnonzero(mutable)
+    if not len(genes):
+        return chrom, occ
+
+    g        = chrom
+    n_rooms  = len(data["room_ids"])
+    n_hours  = data["n_hours"]
+    hour_lo  = data["hour_lo"]
+    is_ac    = data["room_is_ac"]
+    ac_profs = data["ac_prof_idx"]
+    for i in rng.choice(genes, min(steps, len(genes)), replace=False):
+        prof, room = data["cls_prof"][i], int(g[ROOM, i])
+        base       = (g[DAY, i] - data["day_lo"]) * n_hours
+        lo, dur    = g[START, i] - hour_lo, g[END, i] - g[START, i]
+        prof_day = occ.prof[prof, base:base + n_hours].copy()
+        room_day = occ.room[:, base:base + n_hours].copy()
+        prof_day[lo:lo + dur] -= 1
+        room_day[room, lo:lo + dur] -= 1
+
+        rooms = np.arange(n_rooms)
+        if n_rooms > LOCAL_SEARCH_ROOMS:
+            rooms = np.union1d(rng.choice(n_rooms, LOCAL_SEARCH_ROOMS, replace=False), [room])
+        starts = np.array([lo])
+        if data["cls_ai"][i]:
+            starts = np.union1d(data["cls_starts"][i], starts)
+
+        clash = (
+            window_sums(prof_day > 0, starts, dur)[None, :]
+            + window_sums(room_day[rooms] > 0, starts, dur)
+        )
+        room_hrs = occ.room_hrs.copy()
+        room_hrs[room] -= dur
+        trial = np.repeat(room_hrs[None], len(rooms), axis=0)
+        trial[np.arange(len(rooms)), rooms] += dur
+        gr = gini_batch(trial)
+
+        k = data["prof_ac_pos"][prof]
+        if k >= 0:
+            ac_hrs = occ.ac_hrs[ac_profs]
+            ac_hrs[k] -= dur * is_ac[room]
+            ga = gini_batch(np.stack([ac_hrs, ac_hrs + dur * (np.arange(len(ac_profs)) == k)]))
+            ga = ga[is_ac[rooms].astype(int)]
         else:
-            c1.append(g2.copy())
-            c2.append(g1.copy())
-    return c1, c2
-
-
-def mutate(chrom: list, rate: float, data: dict) -> list:
-    cls_lookup = {c["slot_id"]: c for c in data["classes"]}
-    result = []
-    for gene in chrom:
-        g = gene.copy()
-        if random.random() < rate:
-            g["room_id"] = pick_room(g["needs_ac"], data)["id"]
-        if g.get("ai_assign") and random.random() < rate:
-            cls      = cls_lookup.get(g["slot_id"])
-            duration = cls["duration"] if cls else 1
-            max_start = max(SCHEDULE_START, SCHEDULE_END - duration)
-            start    = random.randint(SCHEDULE_START, max_start)
-            g["start_hour"] = start
-            g["end_hour"]   = min(start + duration, SCHEDULE_END)
-            # day_of_week is intentionally left unchanged
-        result.append(g)
-    return result
-
-
-def run_genetic_algorithm() -> dict:
-    data = load_data()
-    pop  = init_population(data)
+            ga = np.zeros(len(rooms))
+
+        bonus = data["cls_needs_ac"][i] & is_ac[rooms]
+        score = -W_HARD * clash + (W_AC_BON * bonus - W_GINI_R * gr - W_GINI_A * ga)[:, None]
+        cur   = score[np.searchsorted(rooms, room), np.searchsorted(starts, lo)]
+        r, s  = np.unravel_index(np.argmax(score), score.shape)
+        if score[r, s] <= cur + 1e-9:
+            continue
+
+        if not owned:
+            occ, owned = occ.copy(), True
+        if g is chrom:
+            g = chrom.copy()
+        new_room, new_lo = int(rooms[r]), int(starts[s])
+        occ.relocate(i, base, room, lo, new_room, new_lo, dur, data)
+        g[ROOM, i]  = new_room
+        g[START, i] = new_lo + hour_lo
+        g[END, i]   = new_lo + hour_lo + dur
+    return g, occ
+
+
+_worker_data = None
+
+
+def init_worker(data: dict) -> None:
+    global _worker_data
+    _worker_data = data
+
+
+def evaluate_chunk(chunk: list) -> list:
+    return evaluate_population(chunk, _worker_data)
+
+
+def open_pool(data: dict, workers: int):
+    # The problem data is shipped once per worker; tasks carry chromosomes only.
+    return multiprocessing.Pool(workers, initializer=init_worker, initargs=(data,))
+
+
+def evaluate_parallel(pop: list, pool, workers: int) -> list:
+    size   = CHUNK_SIZE or -(-len(pop) // workers)
+    chunks = [pop[i:i + size] for i in range(0, len(pop), size)]
+    return [e for part in pool.map(evaluate_chunk, chunks) for e in part]
+
+
+class RunCancelled(Exception):
+    pass
+
+
+def stop_criteria(target_violations: int = STOP_VIOLATIONS, stagnation: int = STAGNATION_WINDOW,
+                  epsilon: float = IMPROVEMENT_EPS, time_budget: float = TIME_BUDGET) -> dict:
+    return {
+        "target_violations": target_violations,
+        "stagnation":        stagnation,
+        "epsilon":           epsilon,
+        "time_budget":       time_budget,
+    }
+
+
+def stop_reason(stop: dict, best_hv: int, stalled: int, elapsed: float):
+    # target_violations: the best schedule has at most that many violations;
+    # stagnation: no gain above epsilon for that many generations;
+    # time_budget: wall-clock seconds since evolve() started.
+    if stop["target_violations"] >= 0 and best_hv <= stop["target_violations"]:
+        return "target_violations"
+    if stop["stagnation"] > 0 and stalled >= stop["stagnation"]:
+        return "stagnation"
+    if stop["time_budget"] > 0 and elapsed >= stop["time_budget"]:
+        return "time_budget"
+    return None
+
+
+def evolve(data: dict, pool=None, workers: int = 1, migrate=None, on_generation=None,
+           cancel=None, stop: dict = None, warm: dict = None, rng: np.random.Generator = None) -> dict:
+    # rng is the run's only source of randomness; a fresh unseeded one
+    # is used when none is given.
+    rng     = rng if rng is not None else np.random.default_rng()
+    stop    = stop or stop_criteria()
+    if 0 <= stop["target_violations"] < data["prof_floor"] + data["room_bound"]:
+        # below what the fixed slots force, the target could never be met
+        stop = dict(stop, target_violations=data["prof_floor"] + data["room_bound"])
+    pop     = warm_population(warm, data, rng) if warm else init_population(data, rng)
+    mutable = warm["mutable"] if warm else None
+    occs = [Occupancy.build(c, data) for c in pop] if DELTA_EVAL and pool is None else None
 
     best_chrom = None
     best_fit   = -float("inf")
@@ -244,12 +1023,52 @@ def run_genetic_algorithm() -> dict:
     best_gw = best_gr = best_ga = 0.0
     rate       = MUTATION_RATE_INIT
     no_improve = 0
+    timings    = dict.fromkeys(GA_PHASES, 0.0)
+    clock      = time.perf_counter
+    gen        = -1
+    evaluated  = 0
+    cache      = FitnessCache()
+    stalled    = 0
+    reason     = "max_generations"
+    started    = clock()
 
     for gen in range(MAX_GENERATIONS):
-        evals = [fitness(c, data) for c in pop]
+        if cancel is not None and cancel.is_set():
+            raise RunCancelled()
+
+        before = dict(timings)
+        t0     = clock()
+        if pool is not None:
+            evals = cache.evaluate(pop, lambda idx: evaluate_parallel([pop[i] for i in idx], pool, workers))
+        elif occs is None:
+            evals = cache.evaluate(pop, lambda idx: evaluate_population([pop[i] for i in idx], data))
+        else:
+            evals = cache.evaluate(pop, lambda idx: [occs[i].fitness(data) for i in idx])
+        if migrate is not None:
+            for i in migrate(gen, pop, evals):
+                if occs is not None:
+                    occs[i] = Occupancy.build(pop[i], data)
+        timings["evaluation"] += clock() - t0
+        evaluated = cache.misses
+
+        # one descending sort per generation serves local search and elitism;
+        # local search only raises the elites' fitness, so they stay on top
+        order = np.argsort([-e[0] for e in evals], kind="stable")[:ELITISM_COUNT].tolist()
+        if LOCAL_SEARCH_EVERY and gen % LOCAL_SEARCH_EVERY == 0:
+            t0 = clock()
+            for i in order:
+                occ = occs[i] if occs is not None else None
+                chrom, occ = local_search(pop[i], data, rng, occ, mutable, LOCAL_SEARCH_STEPS)
+                if chrom is not pop[i]:
+                    pop[i], evals[i] = chrom, occ.fitness(data)
+                    cache.put(cache.key(chrom), evals[i])
+                    if occs is not None:
+                        occs[i] = occ
+            timings["local_search"] += clock() - t0
         fits  = [e[0] for e in evals]
         bi    = fits.index(max(fits))
 
+        stalled = 0 if fits[bi] - best_fit > stop["epsilon"] else stalled + 1
         if fits[bi] > best_fit:
             best_fit   = fits[bi]
             best_chrom = pop[bi]
@@ -270,21 +1089,346 @@ def run_genetic_algorithm() -> dict:
                 f"rate={rate:.3f}"
             )
 
-        elite_idx = sorted(range(len(pop)), key=lambda i: fits[i], reverse=True)
-        new_pop   = [pop[i] for i in elite_idx[:ELITISM_COUNT]]
+        new_pop  = [pop[i] for i in order]
+        new_occs = [occs[i] for i in order] if occs is not None else None
+        kids, parents = reproduce(pop, np.array(fits), POPULATION_SIZE - len(new_pop),
+                                  rate, data, rng, mutable, timings)
+        for parent, child in zip(parents, kids):
+            t0  = clock()
+            occ = occs[parent].derive(pop[parent], child, data) if new_occs is not None else None
+            t1  = clock()
+            timings["evaluation"] += t1 - t0
+            if rng.random() < REPAIR_RATE:
+                child, occ = repair(child, data, rng, occ, mutable, REPAIR_GENES)
+                timings["repair"] += clock() - t1
+            new_pop.append(child)
+            if new_occs is not None:
+                new_occs.append(occ)
 
-        while len(new_pop) < POPULATION_SIZE:
-            p1, p2 = tournament(pop, fits), tournament(pop, fits)
-            if random.random() < CROSSOVER_PROB:
-                c1, c2 = crossover(p1, p2)
-            else:
-                c1 = [g.copy() for g in p1]
-                c2 = [g.copy() for g in p2]
-            new_pop.append(mutate(c1, rate, data))
-            if len(new_pop) < POPULATION_SIZE:
-                new_pop.append(mutate(c2, rate, data))
+        pop, occs = new_pop, new_occs
+
+        if on_generation is not None:
+            on_generation({
+                "generation":      gen,
+                "best_fitness":    best_fit,
+                "hard_violations": best_hv,
+                "gini_workload":   best_gw,
+                "gini_room_usage": best_gr,
+                "gini_ac_access":  best_ga,
+                "gen_best":        fits[bi],
+                "gen_mean":        sum(fits) / len(fits),
+                "gen_worst":       min(fits),
+                "gen_violations":  evals[bi][1],
+                "mutation_rate":   rate,
+                "evaluations":     evaluated,
+                "phase_seconds":   {p: timings[p] - before[p] for p in GA_PHASES},
+            })
 
-        pop = new_pop
+        hit = stop_reason(stop, best_hv, stalled, clock() - started)
+        if hit is not None:
+            reason = hit
+            print(f"Stopped after gen {gen:03d}: {reason}")
+            break
+
+    return {
+        "chrom":       best_chrom,
+        "fitness":     best_fit,
+        "hv":          best_hv,
+        "gw":          best_gw,
+        "gr":          best_gr,
+        "ga":          best_ga,
+        "generations": gen + 1,
+        "evaluations": evaluated,
+        "cache":       cache.stats(),
+        "stop_reason": reason,
+        "timings":     timings,
+    }
+
+
+def island_targets(index: int, islands: int, topology: str) -> list:
+    if topology == "ring":
+        return [(index + 1) % islands]
+    return [j for j in range(islands) if j != index]
+
+
+def run_island(index: int, data: dict, inboxes: list, targets: list, interval: int,
+               migrants: int, seed: int, results, progress: bool, stop: dict, warm: dict) -> None:
+
+    def migrate(gen: int, pop: list, evals: list) -> list:
+        # Asynchronous migration: send our best, take whatever has arrived,
+        # and let the immigrants replace our worst individuals.
+        if gen == 0 or gen % interval:
+            return []
+        order = sorted(range(len(pop)), key=lambda i: evals[i][0], reverse=True)
+        out   = [(pop[i], evals[i]) for i in order[:migrants]]
+        for t in targets:
+            inboxes[t].put(out)
+        incoming = []
+        while True:
+            try:
+                incoming.extend(inboxes[index].get_nowait())
+            except queue.Empty:
+                break
+        worst = order[::-1][:min(len(incoming), len(pop) - ELITISM_COUNT)]
+        for i, (chrom, ev) in zip(worst, incoming):
+            pop[i], evals[i] = chrom, ev
+        return worst
+
+    def report(stats: dict) -> None:
+        results.put(("progress", index, dict(stats, island=index)))
+
+    best = evolve(data, migrate=migrate, on_generation=report if progress else None,
+                  stop=stop, warm=warm, rng=np.random.default_rng(seed))
+    results.put(("done", index, best))
+    for t in targets:
+        inboxes[t].cancel_join_thread()
+
+
+def collect(procs: list, results, on_generation=None, cancel=None, what: str = "island") -> dict:
+    # Starts procs and gathers one ("done", index, best) per process from
+    # results, forwarding ("progress", index, stats) as it arrives.
+    for p in procs:
+        p.start()
+    bests = {}
+    while len(bests) < len(procs):
+        if cancel is not None and cancel.is_set():
+            for p in procs:
+                p.terminate()
+            raise RunCancelled()
+        try:
+            kind, i, payload = results.get(timeout=1)
+        except queue.Empty:
+            if any(not p.is_alive() and p.exitcode for p in procs):
+                for p in procs:
+                    p.terminate()
+                raise RuntimeError(f"An {what} process exited without a result.")
+            continue
+        if kind == "progress":
+            on_generation(payload)
+        else:
+            bests[i] = payload
+    for p in procs:
+        p.join()
+    return bests
+
+
+def run_islands(data: dict, islands: int, interval: int, migrants: int, topology: str,
+                on_generation=None, cancel=None, stop: dict = None, warm: dict = None,
+                rng: np.random.Generator = None) -> dict:
+    # Each island's seed is drawn from the run's rng, so the islands start
+    # reproducibly; asynchronous migration timing can still differ.
+    rng     = rng if rng is not None else np.random.default_rng()
+    seeds   = rng.integers(2**32, size=islands).tolist()
+    inboxes = [multiprocessing.Queue() for _ in range(islands)]
+    results = multiprocessing.Queue()
+    procs   = [
+        multiprocessing.Process(
+            target=run_island,
+            args=(i, data, inboxes, island_targets(i, islands, topology),
+                  interval, migrants, seeds[i], results,
+                  on_generation is not None, stop or stop_criteria(), warm),
+            daemon=True,
+        )
+        for i in range(islands)
+    ]
+    bests = collect(procs, results, on_generation, cancel, "island")
+    best  = max(bests.values(), key=lambda b: b["fitness"])
+    return dict(
+        best,
+        evaluations = sum(b["evaluations"] for b in bests.values()),
+        cache       = {k: sum(b["cache"][k] for b in bests.values()) for k in best["cache"]},
+    )
+
+
+def conflict_components(data: dict) -> list:
+    # Two classes can only clash on the same day in overlapping hours, and
+    # any class may take any room, so the class-conflict graph's connected
+    # components are runs of overlapping hour windows within a day. Fixed
+    # classes span their own hours, AI-assigned ones every hour they could
+    # start in. Returns one array of class indices per component.
+    t    = data["template"]
+    span = SCHEDULE_END + 1
+    lo   = np.where(data["cls_ai"], SCHEDULE_START, t[START])
+    hi   = np.where(data["cls_ai"], data["cls_max_start"] + data["cls_duration"], t[END])
+    lo, hi = t[DAY] * span + lo, t[DAY] * span + hi   # days never overlap
+    order  = np.lexsort((lo, t[DAY]))
+    reach  = np.maximum.accumulate(hi[order])
+    breaks = np.flatnonzero(lo[order][1:] >= reach[:-1]) + 1
+    return np.split(order, breaks)
+
+
+def partition(components: list, parts: int) -> list:
+    # Packs components into at most `parts` groups of similar size, largest
+    # first into the currently smallest group; a group's classes still never
+    # clash with another group's.
+    groups = [[] for _ in range(max(1, min(parts, len(components))))]
+    sizes  = [0] * len(groups)
+    for comp in sorted(components, key=len, reverse=True):
+        g = sizes.index(min(sizes))
+        groups[g].append(comp)
+        sizes[g] += len(comp)
+    return [np.sort(np.concatenate(g)) for g in groups]
+
+
+def subproblem(data: dict, idx: np.ndarray) -> dict:
+    # The same rooms and professors with only the classes in idx; room
+    # indices match the full problem, so part genes copy straight back.
+    return prepare_data(data["professors"], data["rooms"], [data["slots"][i] for i in idx.tolist()])
+
+
+def run_part(index: int, sub: dict, seed: int, results, progress: bool, stop: dict, warm: dict) -> None:
+    def report(stats: dict) -> None:
+        results.put(("progress", index, dict(stats, part=index)))
+
+    best = evolve(sub, on_generation=report if progress else None,
+                  stop=stop, warm=warm, rng=np.random.default_rng(seed))
+    results.put(("done", index, best))
+
+
+def reconcile(chrom: np.ndarray, data: dict, rng: np.random.Generator, mutable: np.ndarray = None,
+              passes: int = RECONCILE_PASSES) -> tuple:
+    # Each part only balanced its own room usage and AC access; local search
+    # over the whole assembled schedule settles the global Gini terms.
+    occ = Occupancy.build(chrom, data)
+    for _ in range(passes):
+        new, occ = local_search(chrom, data, rng, occ, mutable, chrom.shape[1])
+        if new is chrom:
+            break
+        chrom = new
+    return chrom, occ.fitness(data)
+
+
+def run_decomposed(data: dict, parts: int = DECOMPOSE_PARTS, on_generation=None, cancel=None,
+                   stop: dict = None, warm: dict = None, rng: np.random.Generator = None) -> dict:
+    # One GA per group of conflict components, each in its own process, so
+    # search cost follows the largest group rather than the institution.
+    rng     = rng if rng is not None else np.random.default_rng()
+    t0      = time.perf_counter()
+    groups  = partition(conflict_components(data), parts or os.cpu_count() or 1)
+    seeds   = rng.integers(2**32, size=len(groups)).tolist()
+    results = multiprocessing.Queue()
+    procs   = []
+    for i, idx in enumerate(groups):
+        part_warm = warm and {
+            "chrom":   warm["chrom"][:, idx],
+            "changed": warm["changed"][idx],
+            "mutable": None if warm["mutable"] is None else warm["mutable"][idx],
+            "source":  warm["source"],
+        }
+        procs.append(multiprocessing.Process(
+            target=run_part,
+            args=(i, subproblem(data, idx), seeds[i], results,
+                  on_generation is not None, stop or stop_criteria(), part_warm),
+            daemon=True,
+        ))
+    print(f"Decomposed {len(data['classes'])} slots into {len(groups)} parts: {[len(g) for g in groups]}")
+    split_time = time.perf_counter() - t0
+
+    bests = collect(procs, results, on_generation, cancel, "part")
+
+    t0    = time.perf_counter()
+    chrom = data["template"].copy()
+    for i, idx in enumerate(groups):
+        chrom[:, idx] = bests[i]["chrom"]
+    chrom, (fit, hv, gw, gr, ga) = reconcile(chrom, data, rng, warm and warm["mutable"])
+
+    # phase seconds are summed over parts, i.e. CPU time rather than wall time
+    timings = {p: sum(b["timings"][p] for b in bests.values()) for p in GA_PHASES}
+    timings["decompose"] = split_time
+    timings["reconcile"] = time.perf_counter() - t0
+    largest = bests[max(range(len(groups)), key=lambda i: len(groups[i]))]
+    return {
+        "chrom":       chrom,
+        "fitness":     fit,
+        "hv":          hv,
+        "gw":          gw,
+        "gr":          gr,
+        "ga":          ga,
+        "generations": max(b["generations"] for b in bests.values()),
+        "evaluations": sum(b["evaluations"] for b in bests.values()),
+        "cache":       {k: sum(b["cache"][k] for b in bests.values()) for k in largest["cache"]},
+        "stop_reason": largest["stop_reason"],
+        "timings":     timings,
+        "parts":       [len(g) for g in groups],
+    }
+
+
+def run_genetic_algorithm(
+    islands:            int = 1,
+    migration_interval: int = MIGRATION_INTERVAL,
+    migrants:           int = MIGRANTS,
+    topology:           str = "ring",
+    on_generation             = None,
+    cancel                    = None,
+    stop:               dict = None,
+    warm_start:         bool = False,
+    from_schedule:      int  = None,
+    restrict_mutation:  bool = False,
+    seed:               int  = None,
+    decompose:          bool = DECOMPOSE,
+    allow_infeasible:   bool = ALLOW_INFEASIBLE,
+) -> dict:
+    if topology not in ISLAND_TOPOLOGIES:
+        raise ValueError(f"Unknown island topology {topology!r}; expected one of {ISLAND_TOPOLOGIES}.")
+    if decompose and islands > 1:
+        raise ValueError("decompose runs one GA per part and cannot be combined with islands.")
+
+    # Every random choice in the run comes from this one generator, so the
+    # same seed, data and settings replay the same run (islands aside).
+    seed = secrets.randbits(32) if seed is None else int(seed)
+    rng  = np.random.default_rng(seed)
+
+    t0        = time.perf_counter()
+    data      = load_data()
+    load_time = time.perf_counter() - t0
+
+    analysis = pre_analysis(data)
+    if not analysis["feasible"]:
+        print(
+            f"Fixed slots force at least {analysis['lower_bound']} violations: "
+            f"{len(analysis['professor_clashes'])} professor double-bookings, "
+            f"{len(analysis['room_overflows'])} hours with more classes than rooms"
+        )
+        if not allow_infeasible:
+            metrics.record_run("infeasible")
+            return {"error": "Fixed slots clash; no conflict-free schedule exists.", "infeasible": analysis}
+
+    # from_schedule implies a warm start; restrict_mutation only applies to one
+    warm = None
+    if warm_start or from_schedule is not None:
+        warm = warm_start_seed(data, rng, from_schedule, restrict_mutation)
+        print(
+            f"Warm start from {warm['source']}: {int(warm['changed'].sum())} changed slots"
+            + (f", {int(warm['mutable'].sum())} mutable" if warm["mutable"] is not None else "")
+        )
+
+    try:
+        if decompose:
+            best = run_decomposed(
+                data, on_generation=on_generation, cancel=cancel, stop=stop, warm=warm, rng=rng,
+            )
+        elif islands > 1:
+            best = run_islands(
+                data, islands, max(1, migration_interval), max(0, migrants), topology,
+                on_generation=on_generation, cancel=cancel, stop=stop, warm=warm, rng=rng,
+            )
+        elif WORKERS > 1:
+            with open_pool(data, WORKERS) as pool:
+                best = evolve(data, pool, WORKERS, on_generation=on_generation, cancel=cancel,
+                              stop=stop, warm=warm, rng=rng)
+        else:
+            best = evolve(data, on_generation=on_generation, cancel=cancel, stop=stop, warm=warm, rng=rng)
+    except RunCancelled:
+        metrics.record_run("cancelled")
+        raise
+    except Exception:
+        metrics.record_run("failed")
+        raise
+
+    best_chrom, best_fit, best_hv = best["chrom"], best["fitness"], best["hv"]
+    best_gw, best_gr, best_ga     = best["gw"], best["gr"], best["ga"]
+    timings = dict(best["timings"], load=load_time)
+    t0      = time.perf_counter()
 
     soft_score = -(best_gw + best_gr + best_ga)
 
@@ -295,23 +1439,51 @@ def run_genetic_algorithm() -> dict:
         gini_workload   = float(best_gw),
         gini_room_usage = float(best_gr),
         gini_ac_access  = float(best_ga),
-        notes           = f"GA pop={POPULATION_SIZE} gen={MAX_GENERATIONS} slots={len(data['classes'])} violations={best_hv}",
+        notes           = (
+            f"GA pop={POPULATION_SIZE} gen={best['generations']}/{MAX_GENERATIONS} "
+            f"islands={max(1, islands)} slots={len(data['classes'])} violations={best_hv} "
+            f"floor={analysis['lower_bound']} "
+            f"stop={best['stop_reason']} seed={seed}" + (f" warm={warm['source']}" if warm else "")
+            + (f" parts={len(best['parts'])}" if decompose else "")
+        ),
     )
 
     if err:
         print(f"save_generated_schedule failed: {err}")
+        metrics.record_run("failed", best, timings)
         return {"error": err}
 
-    _, slot_err = database.save_schedule_slots(sched_id, best_chrom)
+    genes = decode(best_chrom, data)
+
+    _, hist_err = database.save_generated_schedule_slots(sched_id, genes)
+    if hist_err:
+        print(f"save_generated_schedule_slots errors: {hist_err}")
+
+    _, slot_err = database.save_schedule_slots(sched_id, genes, data["slots"])
     if slot_err:
         print(f"save_schedule_slots errors: {slot_err}")
+    timings["write_back"] = time.perf_counter() - t0
+    metrics.record_run("ok", best, timings)
 
     return {
         "schedule_id":     sched_id,
         "fitness_score":   best_fit,
         "hard_violations": best_hv,
+        "lower_bound":     analysis["lower_bound"],
         "soft_score":      soft_score,
         "gini_workload":   best_gw,
         "gini_room_usage": best_gr,
         "gini_ac_access":  best_ga,
+        "generations":     best["generations"],
+        "evaluations":     best["evaluations"],
+        "fitness_cache":   best["cache"],
+        "seed":            seed,
+        "stop_reason":     best["stop_reason"],
+        "parts":           best.get("parts"),
+        "warm_start":      warm and {
+            "source":  warm["source"],
+            "changed": int(warm["changed"].sum()),
+            "mutable": None if warm["mutable"] is None else int(warm["mutable"].sum()),
+        },
+        "timings":         timings,
     }
\ No newline at end of file
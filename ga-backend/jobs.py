@@ -0,0 +1,115 @@
+import os, threading, time, uuid
+from concurrent.futures import ThreadPoolExecutor
+from ga_engine import RunCancelled
+
+JOB_WORKERS    = int(os.getenv("GA_JOB_WORKERS", 1))
+JOB_QUEUE_SIZE = int(os.getenv("GA_JOB_QUEUE",   4))
+JOB_HISTORY    = int(os.getenv("GA_JOB_HISTORY", 50))
+
+ACTIVE   = ("queued", "running")
+FINISHED = ("done", "failed", "cancelled")
+
+_executor = ThreadPoolExecutor(max_workers=max(1, JOB_WORKERS), thread_name_prefix="ga-job")
+_jobs: dict = {}
+_lock = threading.Lock()
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, params: dict):
+        self.id           = uuid.uuid4().hex
+        self.params       = params
+        self.status       = "queued"
+        self.generation   = 0
+        self.best_fitness = None
+        self.violations   = None
+        self.events       = []
+        self.result       = None
+        self.error        = None
+        self.created_at   = time.time()
+        self.started_at   = None
+        self.finished_at  = None
+        self.cancel_event = threading.Event()
+        self.future       = None
+
+    def progress(self, stats: dict) -> None:
+        # Every generation's stats are kept for the SSE stream; list.append
+        # is atomic, so readers can slice while the job is still appending.
+        self.events.append(stats)
+        self.generation = max(self.generation, stats["generation"])
+        if self.best_fitness is None or stats["best_fitness"] > self.best_fitness:
+            self.best_fitness = stats["best_fitness"]
+            self.violations   = stats["hard_violations"]
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id":          self.id,
+            "status":          self.status,
+            "params":          self.params,
+            "generation":      self.generation,
+            "best_fitness":    self.best_fitness,
+            "hard_violations": self.violations,
+            "result":          self.result,
+            "error":           self.error,
+            "created_at":      self.created_at,
+            "started_at":      self.started_at,
+            "finished_at":     self.finished_at,
+        }
+
+
+def _run(job: Job, fn) -> None:
+    if job.cancel_event.is_set():
+        job.status, job.finished_at = "cancelled", time.time()
+        return
+    job.status, job.started_at = "running", time.time()
+    try:
+        job.result = fn(job)
+        job.status = "done"
+    except RunCancelled:
+        job.status = "cancelled"
+    except Exception as e:
+        print(f"[JOB] {job.id} failed: {e}")
+        job.status, job.error = "failed", str(e)
+    finally:
+        job.finished_at = time.time()
+
+
+def _prune() -> None:
+    done = sorted((j for j in _jobs.values() if j.status in FINISHED), key=lambda j: j.created_at)
+    for j in done[:max(0, len(done) - JOB_HISTORY)]:
+        del _jobs[j.id]
+
+
+def submit(fn, params: dict) -> Job:
+    # fn(job) runs on the executor and returns the job's result.
+    with _lock:
+        if sum(1 for j in _jobs.values() if j.status in ACTIVE) >= JOB_QUEUE_SIZE:
+            raise JobQueueFull(f"{JOB_QUEUE_SIZE} schedule jobs already queued or running")
+        _prune()
+        job = Job(params)
+        _jobs[job.id] = job
+        job.future = _executor.submit(_run, job, fn)
+    return job
+
+
+def get(job_id: str):
+    return _jobs.get(job_id)
+
+
+def cancel(job_id: str):
+    job = _jobs.get(job_id)
+    if job is None or job.status in FINISHED:
+        return job
+    job.cancel_event.set()
+    if job.future.cancel():
+        job.status, job.finished_at = "cancelled", time.time()
+    return job
+
+
+def counts() -> dict:
+    with _lock:
+        statuses = [j.status for j in _jobs.values()]
+    return {status: statuses.count(status) for status in ACTIVE + FINISHED}
@@ -1,10 +1,23 @@
-from fastapi import FastAPI, HTTPException
+import asyncio, json, os
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse
 import database
-from ga_engine import run_genetic_algorithm
+import jobs
+import metrics
+import read_cache
+from ga_engine import (
+    run_genetic_algorithm, problem_rows, load_data, pre_analysis, stop_criteria, ISLAND_TOPOLOGIES,
+    MIGRATION_INTERVAL, MIGRANTS, STOP_VIOLATIONS, STAGNATION_WINDOW, IMPROVEMENT_EPS, TIME_BUDGET,
+    DECOMPOSE, ALLOW_INFEASIBLE,
+)
 
 app = FastAPI(title="EQ-Schedule API", version="3.0")
 
+PAGE_LIMIT        = int(os.getenv("API_PAGE_LIMIT", 1000))
+SCHEDULE_STATUSES = ("pending", "approved", "rejected")
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -15,6 +28,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
 
@@ -25,9 +39,7 @@ def root():
 
 @app.get("/api/health")
 async def health():
-    professors = database.get_all_professors()
-    rooms      = database.get_all_rooms()
-    slots      = database.get_all_timetable_slots()
+    professors, rooms, slots = await run_in_threadpool(problem_rows)
 
     issues = []
     if not professors:
@@ -48,62 +60,319 @@ async def health():
     }
 
 
+def parse_fields(fields: str, allowed: tuple) -> tuple:
+    # "a,b,c" -> ("id", "a", "b", "c"); id is always kept for the cursor
+    if fields is None:
+        return None
+    columns = tuple(dict.fromkeys(("id",) + tuple(f.strip() for f in fields.split(",") if f.strip())))
+    unknown = [c for c in columns if c not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return columns
+
+
+def check_limit(limit: int) -> None:
+    if limit is not None and not 1 <= limit <= PAGE_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {PAGE_LIMIT}")
+
+
+def page(rows: list, limit: int) -> tuple:
+    # Pages are fetched with limit + 1 rows; the extra row only signals
+    # that there is a next page, whose cursor is the last id returned.
+    if limit is None or len(rows) <= limit:
+        return rows, None
+    return rows[:limit], rows[limit - 1]["id"]
+
+
+async def cached_read(request: Request, kind: str, params: dict, build) -> Response:
+    # build() -> (payload, headers). Responses are cached per storage
+    # version; a matching If-None-Match gets a 304 without building anything.
+    # build() raises when the read fails, so an error is never cached.
+    current = await run_in_threadpool(read_cache.version, kind)
+    if current is None:
+        payload, headers = await run_in_threadpool(build)
+        return Response(json.dumps(payload, default=str), media_type="application/json", headers=headers)
+
+    tag = read_cache.etag(kind, params, current)
+    if read_cache.matches(request.headers.get("if-none-match"), tag):
+        return Response(status_code=304, headers={"ETag": tag, "Cache-Control": "no-cache"})
+    entry = read_cache.get(tag)
+    if entry is None:
+        entry = read_cache.put(tag, *await run_in_threadpool(build))
+    body, headers = entry
+    return Response(body, media_type="application/json", headers={**headers, "ETag": tag, "Cache-Control": "no-cache"})
+
+
 @app.get("/api/timetable")
-async def get_timetable():
-    return database.get_timetable_slots()
+async def get_timetable(
+    request:   Request,
+    fields:    str = None,
+    professor: int = None,
+    day:       int = None,
+    room:      str = None,
+    cursor:    int = None,
+    limit:     int = None,
+):
+    # Without limit the full list is returned as before; with it the next
+    # page's cursor comes back in the X-Next-Cursor header.
+    columns = parse_fields(fields, database.TIMETABLE_COLUMNS)
+    check_limit(limit)
+
+    def build():
+        rows = database.get_timetable_slots(
+            columns, professor, day, room, cursor, limit + 1 if limit else None,
+        )
+        rows, next_cursor = page(rows, limit)
+        return rows, ({"X-Next-Cursor": str(next_cursor)} if next_cursor is not None else {})
+
+    params = {"fields": columns, "professor": professor, "day": day, "room": room, "cursor": cursor, "limit": limit}
+    try:
+        return await cached_read(request, "timetable", params, build)
+    except Exception as e:
+        print(f"[DB] get_timetable_slots: {e}")
+        return []
 
 
 @app.get("/api/schedules")
-async def get_schedules():
+async def get_schedules(
+    request: Request,
+    fields:  str = None,
+    status:  str = None,
+    cursor:  int = None,
+    limit:   int = None,
+):
+    columns = parse_fields(fields, database.SCHEDULE_COLUMNS)
+    check_limit(limit)
+    if status is not None and status not in SCHEDULE_STATUSES:
+        raise HTTPException(status_code=400, detail=f"status must be one of {', '.join(SCHEDULE_STATUSES)}")
+
+    def build():
+        rows = database.get_generated_schedules(columns, status, cursor, limit + 1 if limit else None)
+        rows, next_cursor = page(rows, limit)
+        return {"success": True, "data": rows, "next_cursor": next_cursor}, {}
+
+    params = {"fields": columns, "status": status, "cursor": cursor, "limit": limit}
     try:
-        res = (
-            database.supabase
-            .table("generated_schedules")
-            .select("*")
-            .order("created_at", desc=True)
-            .execute()
-        )
-        return {"success": True, "data": res.data}
+        return await cached_read(request, "schedules", params, build)
     except Exception as e:
         return {"success": False, "message": str(e), "data": []}
 
 
-@app.post("/api/generate-schedule")
-async def generate_schedule(runs: int = 1):
-    slots = database.get_all_timetable_slots()
-    if not slots:
-        raise HTTPException(
-            status_code=400,
-            detail="No timetable slots found. Add subjects via Admin panel first."
-        )
+@app.get("/api/schedules/{schedule_id}")
+async def get_schedule(schedule_id: int):
+    schedule = await run_in_threadpool(database.get_generated_schedule, schedule_id)
+    if schedule is None:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    slots = await run_in_threadpool(database.get_generated_schedule_slots, schedule_id)
+    return {"success": True, "data": {"schedule": schedule, "slots": slots}}
+
+
+@app.get("/api/schedules/{schedule_id}/diff/{other_id}")
+async def diff_schedules(schedule_id: int, other_id: int):
+    old_slots = await run_in_threadpool(database.get_generated_schedule_slots, schedule_id)
+    new_slots = await run_in_threadpool(database.get_generated_schedule_slots, other_id)
+    if not old_slots or not new_slots:
+        raise HTTPException(status_code=404, detail="No stored slots for one of the schedules")
+    return {
+        "success": True,
+        "from":    schedule_id,
+        "to":      other_id,
+        "data":    database.diff_schedule_slots(old_slots, new_slots),
+    }
+
 
+def run_schedule_job(job: jobs.Job) -> dict:
+    params      = job.params
+    runs        = params["runs"]
     best_result = None
     for run_num in range(max(1, runs)):
         print(f"\n>>> GA Run {run_num + 1} / {runs}")
-        result = run_genetic_algorithm()
+        result = run_genetic_algorithm(
+            islands            = params["islands"],
+            migration_interval = params["migration_interval"],
+            migrants           = params["migrants"],
+            topology           = params["topology"],
+            on_generation      = job.progress,
+            cancel             = job.cancel_event,
+            stop               = stop_criteria(
+                target_violations = params["target_violations"],
+                stagnation        = params["stagnation"],
+                epsilon           = params["epsilon"],
+                time_budget       = params["time_budget"],
+            ),
+            warm_start         = params["warm_start"],
+            from_schedule      = params["from_schedule"],
+            restrict_mutation  = params["restrict_mutation"],
+            seed               = None if params["seed"] is None else params["seed"] + run_num,
+            decompose          = params["decompose"],
+            allow_infeasible   = params["allow_infeasible"],
+        )
+        if "infeasible" in result:
+            # the data changed after the request was accepted; no run can do better
+            raise RuntimeError(f"{result['error']} Lower bound {result['infeasible']['lower_bound']} violations.")
         if "error" in result:
             print(f"    Run failed: {result['error']}")
             continue
         if best_result is None or result["fitness_score"] > best_result["fitness_score"]:
             best_result = result
+    read_cache.invalidate()
 
     if best_result is None:
-        raise HTTPException(status_code=500, detail="GA failed — check terminal logs.")
+        raise RuntimeError("GA failed — check terminal logs.")
 
     return {
         "success":         True,
         "schedule_id":     best_result["schedule_id"],
         "fitness_score":   best_result["fitness_score"],
         "hard_violations": best_result["hard_violations"],
+        "lower_bound":     best_result["lower_bound"],
         "soft_score":      best_result["soft_score"],
         "gini_workload":   best_result["gini_workload"],
         "gini_room_usage": best_result["gini_room_usage"],
         "gini_ac_access":  best_result["gini_ac_access"],
+        "generations":     best_result["generations"],
+        "stop_reason":     best_result["stop_reason"],
+        "warm_start":      best_result["warm_start"],
+        "seed":            best_result["seed"],
+        "parts":           best_result["parts"],
         "auto_approved":   best_result["hard_violations"] == 0,
         "runs_completed":  runs,
+        "islands":         max(1, params["islands"]),
     }
 
 
+@app.post("/api/generate-schedule", status_code=202)
+async def generate_schedule(
+    runs:               int = 1,
+    islands:            int = 1,
+    migration_interval: int = MIGRATION_INTERVAL,
+    migrants:           int = MIGRANTS,
+    topology:           str = "ring",
+    target_violations:  int   = STOP_VIOLATIONS,
+    stagnation:         int   = STAGNATION_WINDOW,
+    epsilon:            float = IMPROVEMENT_EPS,
+    time_budget:        float = TIME_BUDGET,
+    warm_start:         bool  = False,
+    from_schedule:      int   = None,
+    restrict_mutation:  bool  = False,
+    seed:               int   = None,
+    decompose:          bool  = DECOMPOSE,
+    allow_infeasible:   bool  = ALLOW_INFEASIBLE,
+):
+    if topology not in ISLAND_TOPOLOGIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"topology must be one of {', '.join(ISLAND_TOPOLOGIES)}"
+        )
+    if decompose and islands > 1:
+        raise HTTPException(status_code=400, detail="decompose cannot be combined with islands > 1")
+    if seed is not None and seed < 0:
+        raise HTTPException(status_code=400, detail="seed must be a non-negative integer")
+
+    _, _, slots = await run_in_threadpool(problem_rows)
+    if not slots:
+        raise HTTPException(
+            status_code=400,
+            detail="No timetable slots found. Add subjects via Admin panel first."
+        )
+
+    # Fixed slots that already clash make a conflict-free schedule impossible;
+    # report them instead of queueing a run that cannot reach zero.
+    try:
+        data = await run_in_threadpool(load_data)
+    except RuntimeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    analysis = await run_in_threadpool(pre_analysis, data)
+    if not analysis["feasible"] and not allow_infeasible:
+        raise HTTPException(status_code=422, detail={
+            "message": "Fixed slots clash; no conflict-free schedule exists. "
+                       "Edit the listed slots or pass allow_infeasible=true for a best-effort run.",
+            **analysis,
+        })
+
+    if from_schedule is not None:
+        if await run_in_threadpool(database.get_generated_schedule, from_schedule) is None:
+            raise HTTPException(status_code=404, detail="Schedule to warm-start from not found")
+
+    try:
+        job = jobs.submit(run_schedule_job, {
+            "runs":               runs,
+            "islands":            islands,
+            "migration_interval": migration_interval,
+            "migrants":           migrants,
+            "topology":           topology,
+            "target_violations":  target_violations,
+            "stagnation":         stagnation,
+            "epsilon":            epsilon,
+            "time_budget":        time_budget,
+            "warm_start":         warm_start,
+            "from_schedule":      from_schedule,
+            "restrict_mutation":  restrict_mutation,
+            "seed":               seed,
+            "decompose":          decompose,
+            "allow_infeasible":   allow_infeasible,
+        })
+    except jobs.JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+    return {"success": True, "job_id": job.id, "status": job.status}
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@app.get("/api/jobs/{job_id}/events")
+async def job_events(job_id: str, request: Request):
+    # Server-Sent Events: one "generation" event per evolved generation (per
+    # island when islands > 1), then a final "done" event with the job state.
+    # Reconnecting clients resume after the Last-Event-ID they received.
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    last = request.headers.get("last-event-id", "")
+    sent = int(last) + 1 if last.isdigit() else 0
+
+    async def stream():
+        nonlocal sent
+        while True:
+            finished = job.status in jobs.FINISHED
+            for stats in job.events[sent:]:
+                yield f"id: {sent}\nevent: generation\ndata: {json.dumps(stats)}\n\n"
+                sent += 1
+            if finished:
+                yield f"event: done\ndata: {json.dumps(job.to_dict(), default=str)}\n\n"
+                return
+            if await request.is_disconnected():
+                return
+            await asyncio.sleep(0.5)
+
+    return StreamingResponse(
+        stream(),
+        media_type = "text/event-stream",
+        headers    = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/api/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    job = jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    text = metrics.render({"ga_jobs": ("Schedule jobs currently held, by status.", jobs.counts())})
+    return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     import uvicorn
     import os
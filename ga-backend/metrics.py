@@ -0,0 +1,55 @@
+import threading
+
+# Cumulative counters for the process, exposed in Prometheus text format by
+# GET /metrics. Islands run in child processes, so their work is counted here
+# from the totals each run reports back, not from the islands themselves.
+_lock     = threading.Lock()
+_runs     = {"ok": 0, "failed": 0, "cancelled": 0}
+_counters = {"generations": 0, "evaluations": 0, "cache_hits": 0, "cache_misses": 0}
+_seconds  = {}
+
+
+def record_run(status: str, best: dict = None, timings: dict = None) -> None:
+    with _lock:
+        _runs[status] = _runs.get(status, 0) + 1
+        if best is not None:
+            _counters["generations"] += best["generations"]
+            _counters["evaluations"] += best["evaluations"]
+            _counters["cache_hits"]   += best["cache"]["hits"]
+            _counters["cache_misses"] += best["cache"]["misses"]
+        for phase, secs in (timings or {}).items():
+            _seconds[phase] = _seconds.get(phase, 0.0) + secs
+
+
+def render(gauges: dict = None) -> str:
+    with _lock:
+        runs, counters, seconds = dict(_runs), dict(_counters), dict(_seconds)
+
+    lines = [
+        "# HELP ga_runs_total GA runs finished, by outcome.",
+        "# TYPE ga_runs_total counter",
+    ]
+    lines += [f'ga_runs_total{{status="{k}"}} {v}' for k, v in runs.items()]
+    lines += [
+        "# HELP ga_generations_total Generations evolved across all runs.",
+        "# TYPE ga_generations_total counter",
+        f"ga_generations_total {counters['generations']}",
+        "# HELP ga_evaluations_total Individuals evaluated across all runs.",
+        "# TYPE ga_evaluations_total counter",
+        f"ga_evaluations_total {counters['evaluations']}",
+        "# HELP ga_fitness_cache_total Fitness cache lookups, by result.",
+        "# TYPE ga_fitness_cache_total counter",
+        f'ga_fitness_cache_total{{result="hit"}} {counters["cache_hits"]}',
+        f'ga_fitness_cache_total{{result="miss"}} {counters["cache_misses"]}',
+        "# HELP ga_evaluation_seconds_total Time spent evaluating fitness.",
+        "# TYPE ga_evaluation_seconds_total counter",
+        f"ga_evaluation_seconds_total {seconds.get('evaluation', 0.0):.6f}",
+        "# HELP ga_phase_seconds_total Time spent per run phase.",
+        "# TYPE ga_phase_seconds_total counter",
+    ]
+    lines += [f'ga_phase_seconds_total{{phase="{k}"}} {v:.6f}' for k, v in seconds.items()]
+
+    for name, (help_text, values) in (gauges or {}).items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+        lines += [f'{name}{{status="{k}"}} {v}' for k, v in values.items()]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,38 @@
+-- Migration: Track last modification time on the GA input tables
+-- Date: 2026-10-17
+-- Description: The backend caches professors, rooms and timetable slots between GA runs
+-- and health checks. It detects changes from each table's row count and latest
+-- updated_at, so edits need to bump updated_at.
+
+CREATE OR REPLACE FUNCTION set_updated_at() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+ALTER TABLE professors      ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+ALTER TABLE rooms           ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+ALTER TABLE timetable_slots ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+
+DROP TRIGGER IF EXISTS trg_professors_updated_at ON professors;
+CREATE TRIGGER trg_professors_updated_at BEFORE UPDATE ON professors
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+DROP TRIGGER IF EXISTS trg_rooms_updated_at ON rooms;
+CREATE TRIGGER trg_rooms_updated_at BEFORE UPDATE ON rooms
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+DROP TRIGGER IF EXISTS trg_timetable_slots_updated_at ON timetable_slots;
+CREATE TRIGGER trg_timetable_slots_updated_at BEFORE UPDATE ON timetable_slots
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+CREATE INDEX IF NOT EXISTS idx_professors_updated_at      ON professors(updated_at DESC);
+CREATE INDEX IF NOT EXISTS idx_rooms_updated_at           ON rooms(updated_at DESC);
+CREATE INDEX IF NOT EXISTS idx_timetable_slots_updated_at ON timetable_slots(updated_at DESC);
+
+-- Verify migration
+SELECT table_name, column_name, data_type
+FROM information_schema.columns
+WHERE column_name = 'updated_at'
+AND table_name IN ('professors', 'rooms', 'timetable_slots');
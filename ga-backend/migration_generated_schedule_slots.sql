@@ -0,0 +1,22 @@
+-- Migration: Store each GA run's best schedule in generated_schedule_slots
+-- Date: 2026-10-17
+-- Description: Room ids are text (see rooms.id / timetable_slots.room), and each
+-- generated slot now records the timetable slot it schedules so two runs can be
+-- compared slot by slot.
+
+ALTER TABLE generated_schedule_slots
+    ALTER COLUMN room_id TYPE TEXT USING room_id::TEXT;
+
+ALTER TABLE generated_schedule_slots
+    ADD COLUMN IF NOT EXISTS slot_id INTEGER REFERENCES timetable_slots(id) ON DELETE SET NULL;
+
+-- Per-schedule reads and schedule-to-schedule diffs are ordered by slot_id
+CREATE INDEX IF NOT EXISTS idx_gen_schedule_slot ON generated_schedule_slots(schedule_id, slot_id);
+
+COMMENT ON COLUMN generated_schedule_slots.slot_id IS 'timetable_slots row this generated slot schedules (course_id holds the same id)';
+
+-- Verify migration
+SELECT column_name, data_type
+FROM information_schema.columns
+WHERE table_name = 'generated_schedule_slots'
+AND column_name IN ('room_id', 'slot_id');
@@ -0,0 +1,24 @@
+-- Migration: Update-only write-back of GA results
+-- Date: 2026-10-17
+-- Description: The backend writes a run's changed slots back with one call per chunk.
+-- Only room, hour, end_hour and day_of_week are set, and only on rows that still
+-- exist, so edits and deletions made in the admin panel during a run are kept.
+-- Without this function the backend falls back to one UPDATE request per slot.
+
+CREATE OR REPLACE FUNCTION update_timetable_slots(slot_rows JSONB) RETURNS INTEGER AS $$
+    WITH updated AS (
+        UPDATE timetable_slots t
+        SET room        = v.room,
+            hour        = v.hour,
+            end_hour    = v.end_hour,
+            day_of_week = v.day_of_week
+        FROM jsonb_to_recordset(slot_rows) AS v(id INTEGER, room TEXT, hour INTEGER, end_hour INTEGER, day_of_week INTEGER)
+        WHERE t.id = v.id
+          AND (t.room, t.hour, t.end_hour, t.day_of_week) IS DISTINCT FROM (v.room, v.hour, v.end_hour, v.day_of_week)
+        RETURNING 1
+    )
+    SELECT COUNT(*)::INTEGER FROM updated;
+$$ LANGUAGE sql;
+
+-- Verify migration
+SELECT update_timetable_slots('[]'::jsonb);
@@ -0,0 +1,71 @@
+import hashlib, json, os, threading, time
+from collections import OrderedDict
+import database
+
+READ_CACHE_SIZE = int(os.getenv("READ_CACHE_SIZE",  128))
+VERSION_TTL     = float(os.getenv("READ_VERSION_TTL", 5))
+
+# Which storage version guards each cached read: the calendar depends on
+# professors, rooms and timetable_slots; the history on generated_schedules.
+VERSIONS = {
+    "timetable": lambda: database.get_data_version(),
+    "schedules": lambda: database.get_schedules_version(),
+}
+
+_lock      = threading.Lock()
+_versions  = {}             # kind -> (checked_at, version)
+_responses = OrderedDict()  # etag -> (serialized JSON body, extra headers)
+
+
+def version(kind: str):
+    # The storage version is probed at most once per VERSION_TTL, so a
+    # revalidation inside that window never reaches the database. None means
+    # the probe failed and the response must not be cached.
+    now = time.monotonic()
+    with _lock:
+        cached = _versions.get(kind)
+        if cached is not None and now - cached[0] < VERSION_TTL:
+            return cached[1]
+    current = VERSIONS[kind]()
+    if current is not None:
+        with _lock:
+            _versions[kind] = (now, current)
+    return current
+
+
+def invalidate() -> None:
+    # Called after this process writes a schedule, so its own writes show
+    # up without waiting for VERSION_TTL.
+    with _lock:
+        _versions.clear()
+
+
+def etag(kind: str, params: dict, current) -> str:
+    key = repr((kind, sorted(params.items()), current)).encode()
+    return '"' + hashlib.blake2b(key, digest_size=16).hexdigest() + '"'
+
+
+def matches(if_none_match: str, tag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return "*" in tags or tag in tags
+
+
+def get(tag: str):
+    with _lock:
+        entry = _responses.get(tag)
+        if entry is not None:
+            _responses.move_to_end(tag)
+        return entry
+
+
+def put(tag: str, payload, headers: dict) -> tuple:
+    entry = (json.dumps(payload, default=str).encode(), headers)
+    if READ_CACHE_SIZE:
+        with _lock:
+            _responses[tag] = entry
+            _responses.move_to_end(tag)
+            if len(_responses) > READ_CACHE_SIZE:
+                _responses.popitem(last=False)
+    return entry
@@ -61,8 +61,9 @@ CREATE TABLE generated_schedule_slots (
     id SERIAL PRIMARY KEY,
     schedule_id INTEGER NOT NULL REFERENCES generated_schedules(id) ON DELETE CASCADE,
     professor_id INTEGER NOT NULL REFERENCES professors(id) ON DELETE CASCADE,
+    slot_id INTEGER REFERENCES timetable_slots(id) ON DELETE SET NULL,
     course_id INTEGER NOT NULL,
-    room_id INTEGER NOT NULL,
+    room_id TEXT NOT NULL,
     day_of_week INTEGER NOT NULL,
     start_hour INTEGER NOT NULL,
     end_hour INTEGER NOT NULL,
@@ -85,6 +86,7 @@ CREATE INDEX idx_timetable_time ON timetable_slots(day_of_week, hour);
 CREATE INDEX idx_gen_schedule ON generated_schedule_slots(schedule_id);
 CREATE INDEX idx_gen_professor ON generated_schedule_slots(professor_id);
 CREATE INDEX idx_gen_time ON generated_schedule_slots(day_of_week, start_hour);
+CREATE INDEX idx_gen_schedule_slot ON generated_schedule_slots(schedule_id, slot_id);
 
 -- Generated schedules indexes
 CREATE INDEX idx_schedules_status ON generated_schedules(status);
@@ -0,0 +1,306 @@
+import hashlib, os, sqlite3, threading
+
+SQLITE_PATH = os.getenv("SQLITE_PATH", "schedule.db")
+
+# Mirrors schema.sql plus the rooms table and the columns added by the
+# migrations. The live unique (professor|room, day, hour) constraints are
+# left out because the GA may write back a schedule that still has clashes.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS professors (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    title TEXT,
+    department TEXT,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS rooms (
+    id TEXT PRIMARY KEY,
+    room_type TEXT,
+    is_ac BOOLEAN DEFAULT 0,
+    is_faculty BOOLEAN DEFAULT 0,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS timetable_slots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    professor_id INTEGER NOT NULL REFERENCES professors(id) ON DELETE CASCADE,
+    day_of_week INTEGER NOT NULL,
+    hour INTEGER NOT NULL,
+    end_hour INTEGER NOT NULL,
+    subject TEXT NOT NULL,
+    room TEXT NOT NULL,
+    needs_ac BOOLEAN DEFAULT 0,
+    ai_assign_time BOOLEAN NOT NULL DEFAULT 0,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT valid_time_range CHECK (ai_assign_time = 1 OR end_hour > hour)
+);
+
+CREATE TABLE IF NOT EXISTS generated_schedules (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fitness_score REAL NOT NULL,
+    hard_constraint_violations INTEGER NOT NULL DEFAULT 0,
+    soft_constraint_score REAL NOT NULL DEFAULT 0,
+    gini_workload REAL DEFAULT 0,
+    gini_room_usage REAL DEFAULT 0,
+    gini_ac_access REAL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'approved', 'rejected')),
+    generation_date TEXT DEFAULT CURRENT_TIMESTAMP,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    notes TEXT
+);
+
+CREATE TABLE IF NOT EXISTS generated_schedule_slots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    schedule_id INTEGER NOT NULL REFERENCES generated_schedules(id) ON DELETE CASCADE,
+    professor_id INTEGER NOT NULL REFERENCES professors(id) ON DELETE CASCADE,
+    slot_id INTEGER REFERENCES timetable_slots(id) ON DELETE SET NULL,
+    course_id INTEGER NOT NULL,
+    room_id TEXT NOT NULL,
+    day_of_week INTEGER NOT NULL,
+    start_hour INTEGER NOT NULL,
+    end_hour INTEGER NOT NULL,
+    section_id INTEGER,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT valid_gen_time_range CHECK (end_hour > start_hour)
+);
+
+CREATE INDEX IF NOT EXISTS idx_timetable_professor ON timetable_slots(professor_id);
+CREATE INDEX IF NOT EXISTS idx_timetable_room ON timetable_slots(room);
+CREATE INDEX IF NOT EXISTS idx_timetable_time ON timetable_slots(day_of_week, hour);
+CREATE INDEX IF NOT EXISTS idx_gen_schedule ON generated_schedule_slots(schedule_id);
+CREATE INDEX IF NOT EXISTS idx_gen_professor ON generated_schedule_slots(professor_id);
+CREATE INDEX IF NOT EXISTS idx_gen_time ON generated_schedule_slots(day_of_week, start_hour);
+CREATE INDEX IF NOT EXISTS idx_gen_schedule_slot ON generated_schedule_slots(schedule_id, slot_id);
+CREATE INDEX IF NOT EXISTS idx_schedules_status ON generated_schedules(status);
+CREATE INDEX IF NOT EXISTS idx_schedules_date ON generated_schedules(generation_date DESC);
+"""
+
+BOOL_COLUMNS = ("is_ac", "is_faculty", "needs_ac", "ai_assign_time")
+
+_conn = None
+_lock = threading.RLock()
+
+
+def connect() -> sqlite3.Connection:
+    global _conn
+    with _lock:
+        if _conn is None:
+            _conn = sqlite3.connect(SQLITE_PATH, check_same_thread=False)
+            _conn.row_factory = sqlite3.Row
+            _conn.execute("PRAGMA foreign_keys = ON")
+            _conn.executescript(SCHEMA)
+        return _conn
+
+
+def _rows(sql: str, params: tuple = ()) -> list:
+    with _lock:
+        rows = [dict(r) for r in connect().execute(sql, params).fetchall()]
+    for r in rows:
+        for col in BOOL_COLUMNS:
+            if col in r and r[col] is not None:
+                r[col] = bool(r[col])
+    return rows
+
+
+def get_all_professors() -> list:
+    try:
+        return _rows("SELECT * FROM professors")
+    except Exception as e:
+        print(f"[DB] get_all_professors: {e}")
+        return []
+
+
+def get_all_rooms() -> list:
+    try:
+        rows = _rows("SELECT * FROM rooms")
+        for r in rows:
+            if r.get("room_type") == "Laboratory":
+                r["is_ac"] = False
+        return rows
+    except Exception as e:
+        print(f"[DB] get_all_rooms: {e}")
+        return []
+
+
+def get_all_timetable_slots() -> list:
+    try:
+        return _rows("SELECT * FROM timetable_slots")
+    except Exception as e:
+        print(f"[DB] get_all_timetable_slots: {e}")
+        return []
+
+
+def get_data_version():
+    try:
+        return tuple(
+            (table,) + tuple(_rows(f"SELECT COUNT(*) AS n, MAX(updated_at) AS latest FROM {table}")[0].values())
+            for table in ("professors", "rooms", "timetable_slots")
+        )
+    except Exception as e:
+        print(f"[DB] get_data_version: {e}")
+        return None
+
+
+def get_schedules_version():
+    try:
+        rows  = _rows("SELECT id, status FROM generated_schedules ORDER BY id")
+        pairs = repr([(r["id"], r["status"]) for r in rows]).encode()
+        return (len(rows), hashlib.blake2b(pairs, digest_size=8).hexdigest())
+    except Exception as e:
+        print(f"[DB] get_schedules_version: {e}")
+        return None
+
+
+def _where(filters: dict) -> tuple:
+    # filters maps "column op" to a value; None values are left out
+    terms = [(cond, v) for cond, v in filters.items() if v is not None]
+    sql   = " WHERE " + " AND ".join(f"{cond} ?" for cond, _ in terms) if terms else ""
+    return sql, tuple(v for _, v in terms)
+
+
+def get_timetable_slots(
+    columns:      tuple = None,
+    professor_id: int   = None,
+    day_of_week:  int   = None,
+    room:         str   = None,
+    after:        int   = None,
+    limit:        int   = None,
+) -> list:
+    where, params = _where({
+        "t.professor_id =": professor_id,
+        "t.day_of_week =":  day_of_week,
+        "t.room =":         room,
+        "t.id >":           after,
+    })
+    rows = _rows(
+        "SELECT t.*, p.name AS p_name, p.title AS p_title, p.department AS p_department "
+        "FROM timetable_slots t LEFT JOIN professors p ON p.id = t.professor_id"
+        + where + " ORDER BY t.id" + (f" LIMIT {int(limit)}" if limit else ""),
+        params,
+    )
+    for r in rows:
+        r["professors"] = {
+            "id":         r["professor_id"],
+            "name":       r.pop("p_name"),
+            "title":      r.pop("p_title"),
+            "department": r.pop("p_department"),
+        }
+    if columns:
+        rows = [{c: r[c] for c in columns} for r in rows]
+    return rows
+
+
+def get_generated_schedules(
+    columns: tuple = None,
+    status:  str   = None,
+    before:  int   = None,
+    limit:   int   = None,
+) -> list:
+    where, params = _where({"status =": status, "id <": before})
+    return _rows(
+        f"SELECT {', '.join(columns) if columns else '*'} FROM generated_schedules"
+        + where + " ORDER BY id DESC" + (f" LIMIT {int(limit)}" if limit else ""),
+        params,
+    )
+
+
+def save_generated_schedule(
+    fitness_score:   float,
+    hard_violations: int,
+    soft_score:      float,
+    gini_workload:   float = 0.0,
+    gini_room_usage: float = 0.0,
+    gini_ac_access:  float = 0.0,
+    notes:           str   = "",
+) -> tuple:
+    try:
+        with _lock, connect() as conn:
+            cur = conn.execute(
+                "INSERT INTO generated_schedules (fitness_score, hard_constraint_violations, "
+                "soft_constraint_score, status, notes, gini_workload, gini_room_usage, gini_ac_access) "
+                "VALUES (?, ?, ?, 'pending', ?, ?, ?, ?)",
+                (float(fitness_score), int(hard_violations), float(soft_score), str(notes),
+                 float(gini_workload), float(gini_room_usage), float(gini_ac_access)),
+            )
+        return cur.lastrowid, None
+    except Exception as e:
+        return None, f"SQLite error: {e}"
+
+
+def save_generated_schedule_slots(schedule_id: int, chromosome: list) -> tuple:
+    try:
+        with _lock, connect() as conn:
+            conn.executemany(
+                "INSERT INTO generated_schedule_slots (schedule_id, slot_id, course_id, professor_id, "
+                "room_id, day_of_week, start_hour, end_hour) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (schedule_id, int(g["slot_id"]), int(g["slot_id"]), int(g["professor_id"]),
+                     str(g["room_id"]), g["day_of_week"], g["start_hour"], g["end_hour"])
+                    for g in chromosome
+                ],
+            )
+        return True, None
+    except Exception as e:
+        return None, f"SQLite error: {e}"
+
+
+def get_generated_schedule(schedule_id: int):
+    rows = _rows("SELECT * FROM generated_schedules WHERE id = ?", (schedule_id,))
+    return rows[0] if rows else None
+
+
+def get_generated_schedule_slots(schedule_id: int) -> list:
+    return _rows(
+        "SELECT slot_id, professor_id, room_id, day_of_week, start_hour, end_hour "
+        "FROM generated_schedule_slots WHERE schedule_id = ? ORDER BY slot_id",
+        (schedule_id,),
+    )
+
+
+def save_schedule_slots(schedule_id: int, chromosome: list, current_rows: list = None) -> tuple:
+    # Diff-only in SQL: the WHERE clause skips rows that already match.
+    if not chromosome:
+        return None, "chromosome is empty"
+    params = []
+    for g in chromosome:
+        values = (str(g["room_id"]), g["start_hour"], g["end_hour"], g["day_of_week"])
+        params.append(values + (g["slot_id"],) + values)
+    try:
+        with _lock, connect() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "UPDATE timetable_slots SET room = ?, hour = ?, end_hour = ?, day_of_week = ?, "
+                "updated_at = CURRENT_TIMESTAMP "
+                "WHERE id = ? AND NOT (room IS ? AND hour IS ? AND end_hour IS ? AND day_of_week IS ?)",
+                params,
+            )
+            updated = conn.total_changes - before
+    except Exception as e:
+        return None, f"SQLite error: {e}"
+    print(f"[DB] Updated {updated} changed slots ({len(chromosome) - updated} unchanged or missing)")
+    return True, None
+
+
+def insert_problem(professors: list, rooms: list, slots: list) -> None:
+    # Bulk-load rows shaped like the Supabase tables (used for offline runs).
+    with _lock, connect() as conn:
+        conn.executemany(
+            "INSERT INTO professors (id, name, title, department) VALUES (?, ?, ?, ?)",
+            [(p["id"], p["name"], p.get("title"), p.get("department")) for p in professors],
+        )
+        conn.executemany(
+            "INSERT INTO rooms (id, room_type, is_ac, is_faculty) VALUES (?, ?, ?, ?)",
+            [(str(r["id"]), r.get("room_type"), bool(r.get("is_ac")), bool(r.get("is_faculty")))
+             for r in rooms],
+        )
+        conn.executemany(
+            "INSERT INTO timetable_slots (id, professor_id, day_of_week, hour, end_hour, subject, "
+            "room, needs_ac, ai_assign_time) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(s["id"], s["professor_id"], s["day_of_week"], s["hour"], s["end_hour"],
+              s.get("subject", "TBA"), s.get("room", ""), bool(s.get("needs_ac")),
+              bool(s.get("ai_assign_time"))) for s in slots],
+        )
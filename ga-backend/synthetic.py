@@ -0,0 +1,73 @@
+import random
+from ga_engine import SCHEDULE_DAYS, SCHEDULE_START, SCHEDULE_END
+
+# Size of the seed data in schema.sql / the README's thesis evaluation:
+# 10 professors, rooms 322-324 (AC) plus 101, 141, 212, 305 and 401-410.
+THESIS_SIZE = {"professors": 10, "rooms": 17, "slots": 165}
+
+TIERS = {
+    "thesis": 1,
+    "10x":    10,
+    "100x":   100,
+}
+
+
+def generate_institution(
+    n_professors:   int,
+    n_rooms:        int,
+    n_slots:        int,
+    ac_ratio:       float = 0.20,
+    lab_ratio:      float = 0.10,
+    faculty_ratio:  float = 0.05,
+    ai_fraction:    float = 0.30,
+    needs_ac_ratio: float = 0.50,
+    seed:           int   = 0,
+) -> tuple:
+    # Rows shaped like the professors, rooms and timetable_slots tables.
+    rnd = random.Random(seed)
+
+    professors = [
+        {"id": i + 1, "name": f"Professor {i + 1}", "title": "Instructor", "department": f"Dept {i % 8 + 1}"}
+        for i in range(n_professors)
+    ]
+
+    rooms = []
+    for i in range(n_rooms):
+        kind = rnd.random()
+        rooms.append({
+            "id":         str(100 + i),
+            "room_type":  "Laboratory" if kind < lab_ratio else "Lecture",
+            "is_ac":      rnd.random() < ac_ratio,
+            "is_faculty": lab_ratio <= kind < lab_ratio + faculty_ratio,
+        })
+    if all(r["is_faculty"] for r in rooms):
+        rooms[0]["is_faculty"] = False
+
+    slots = []
+    for i in range(n_slots):
+        ai_assign = rnd.random() < ai_fraction
+        hour      = rnd.randint(SCHEDULE_START, SCHEDULE_END - 3)
+        slots.append({
+            "id":             i + 1,
+            "professor_id":   rnd.randint(1, n_professors),
+            "day_of_week":    rnd.choice(SCHEDULE_DAYS),
+            "hour":           hour,
+            "end_hour":       hour + (1 if ai_assign else rnd.randint(1, 3)),
+            "subject":        f"Subject {i % 50 + 1}",
+            "room":           "AUTO" if ai_assign else "PENDING",
+            "needs_ac":       rnd.random() < needs_ac_ratio,
+            "ai_assign_time": ai_assign,
+        })
+
+    return professors, rooms, slots
+
+
+def tier_institution(tier: str, seed: int = 0, **kwargs) -> tuple:
+    scale = TIERS[tier]
+    return generate_institution(
+        THESIS_SIZE["professors"] * scale,
+        THESIS_SIZE["rooms"] * scale,
+        THESIS_SIZE["slots"] * scale,
+        seed=seed,
+        **kwargs,
+    )
@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+from conftest import pairwise_gini
+from ga_engine import (
+    prepare_data, random_chromosome, evaluate_population, fitness, reproduce, Occupancy, FitnessCache,
+    ROOM, DAY, START, END, W_HARD, W_GINI_W, W_GINI_R, W_GINI_A, W_AC_BON,
+)
+from synthetic import generate_institution
+
+
+def reference_fitness(chrom: np.ndarray, data: dict) -> tuple:
+    # The per-chromosome evaluator from before the population was scored
+    # in one pass, written out with plain loops.
+    prof, seen_p, seen_r, hv = data["cls_prof"], set(), set(), 0
+    for i in range(chrom.shape[1]):
+        for h in range(chrom[START, i], chrom[END, i]):
+            pk, rk = (chrom[DAY, i], h, prof[i]), (chrom[DAY, i], h, chrom[ROOM, i])
+            hv += (pk in seen_p) + (rk in seen_r)
+            seen_p.add(pk)
+            seen_r.add(rk)
+
+    dur      = chrom[END] - chrom[START]
+    in_ac    = data["room_is_ac"][chrom[ROOM]]
+    prof_hrs = np.bincount(prof, weights=dur, minlength=len(data["prof_ids"]))
+    room_hrs = np.bincount(chrom[ROOM], weights=dur, minlength=len(data["room_ids"]))
+    ac_hrs   = np.bincount(prof, weights=dur * in_ac, minlength=len(data["prof_ids"]))
+
+    gw  = pairwise_gini(prof_hrs.tolist())
+    gr  = pairwise_gini(room_hrs.tolist())
+    ga  = pairwise_gini(ac_hrs[data["ac_prof_idx"]].tolist()) if len(data["ac_prof_idx"]) else 0.0
+    bon = int((data["cls_needs_ac"] & in_ac).sum())
+    score = -W_HARD * hv - W_GINI_W * gw - W_GINI_R * gr - W_GINI_A * ga + W_AC_BON * bon
+    return score, hv, gw, gr, ga
+
+
+def assert_same(got: tuple, want: tuple) -> None:
+    assert got[1] == want[1]
+    assert got[0] == pytest.approx(want[0], abs=1e-6)
+    assert got[2:] == pytest.approx(want[2:], abs=1e-9)
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_population_matches_reference(seed):
+    rnd  = np.random.default_rng(seed)
+    rows = generate_institution(
+        n_professors   = int(rnd.integers(1, 12)),
+        n_rooms        = int(rnd.integers(1, 10)),
+        n_slots        = int(rnd.integers(1, 60)),
+        ai_fraction    = float(rnd.random()),
+        needs_ac_ratio = float(rnd.choice([0.0, 0.5, 1.0])),
+        seed           = seed,
+    )
+    data = prepare_data(*rows)
+    pop  = [random_chromosome(data, rnd) for _ in range(12)]
+    pop.append(data["template"].copy())  # every class in room 0
+
+    want = [reference_fitness(c, data) for c in pop]
+    for got, ref in zip(evaluate_population(pop, data), want):
+        assert_same(got, ref)
+    for c, ref in zip(pop, want):
+        assert_same(fitness(c, data), ref)
+        assert_same(Occupancy.build(c, data).fitness(data), ref)
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_derived_occupancy_matches_rebuild(seed):
+    # The GA_DELTA_EVAL path: a child's Occupancy comes from its parent's by
+    # moving only the changed genes, and the parent's is left as it was.
+    rnd  = np.random.default_rng(seed)
+    data = prepare_data(*generate_institution(6, 5, 40, ai_fraction=0.5, seed=seed))
+    pop  = [random_chromosome(data, rnd) for _ in range(10)]
+    occs = [Occupancy.build(c, data) for c in pop]
+    fits = np.array([e[0] for e in evaluate_population(pop, data)])
+    kids, parents = reproduce(pop, fits, 20, 0.3, data, rnd)
+
+    for child, p in zip(kids, parents):
+        before = occs[p].copy()
+        occ    = occs[p].derive(pop[p], child, data)
+        full   = Occupancy.build(child, data)
+        assert occ.hv == full.hv
+        assert np.array_equal(occ.prof, full.prof)
+        assert np.array_equal(occ.room, full.room)
+        assert_same(occ.fitness(data), reference_fitness(child, data))
+        for name in ("prof", "room", "prof_hrs", "room_hrs", "ac_hrs"):
+            assert np.array_equal(getattr(occs[p], name), getattr(before, name))
+        assert (occs[p].hv, occs[p].bonus) == (before.hv, before.bonus)
+
+
+def test_cache_scores_duplicates_once():
+    data  = prepare_data(*generate_institution(4, 3, 20, seed=1))
+    rng   = np.random.default_rng(1)
+    a, b  = random_chromosome(data, rng), random_chromosome(data, rng)
+    pop   = [a, b, a.copy(), a.copy(), b.copy()]
+    cache = FitnessCache()
+    calls = []
+
+    def score(idx):
+        calls.append(idx)
+        return evaluate_population([pop[i] for i in idx], data)
+
+    evals = cache.evaluate(pop, score)
+    assert calls == [[0, 1]]
+    assert evals == [fitness(c, data) for c in pop]
+    assert cache.stats() == {"hits": 3, "misses": 2, "size": 2}
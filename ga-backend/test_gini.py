@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from conftest import pairwise_gini
+from ga_engine import gini, gini_batch
+
+
+def random_vectors(seed: int, count: int = 50) -> list:
+    # Non-negative like the hour totals the GA feeds in: sparse, heavy-tailed,
+    # tied, integer and float vectors of length 1 to 40.
+    rng = np.random.default_rng(seed)
+    out = []
+    for _ in range(count):
+        n    = int(rng.integers(1, 41))
+        kind = rng.integers(4)
+        if kind == 0:
+            v = rng.integers(0, 20, n)
+        elif kind == 1:
+            v = rng.exponential(5.0, n) * (rng.random(n) < 0.3)
+        elif kind == 2:
+            v = np.full(n, float(rng.integers(0, 5)))
+        else:
+            v = rng.random(n) * 1e3
+        out.append(v)
+    return out
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_gini_matches_pairwise(seed):
+    for v in random_vectors(seed):
+        assert gini(v.tolist()) == pytest.approx(pairwise_gini(v.tolist()), abs=1e-9)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_gini_batch_matches_pairwise(seed):
+    rng = np.random.default_rng(seed)
+    for n in (1, 2, 3, 17):
+        rows = rng.integers(0, 10, (20, n))
+        rows[0] = 0
+        want = [pairwise_gini(r.tolist()) for r in rows]
+        assert gini_batch(rows).tolist() == pytest.approx(want, abs=1e-9)
+        assert gini_batch(rows.astype(float)).tolist() == pytest.approx(want, abs=1e-9)
+
+
+@pytest.mark.parametrize("values", [[], [0], [7], [0, 0, 0], [0.0] * 10, [3, 3], [0, 5], [1, 2, 3, 4]])
+def test_gini_edge_cases(values):
+    assert gini(values) == pytest.approx(pairwise_gini(values), abs=1e-9)
+    if values:
+        assert gini_batch(np.array([values]))[0] == pytest.approx(pairwise_gini(values), abs=1e-9)
@@ -1,6 +1,8 @@
 import os
 import requests
-from database import supabase
+from database import client
+
+supabase = client()
 
 print('client ready')
 print('env service key length', len(os.getenv('SUPABASE_SERVICE_ROLE_KEY') or ''))